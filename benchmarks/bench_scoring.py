@@ -0,0 +1,242 @@
+"""
+Microbenchmarks of the parsers and scorers with a regression gate.
+
+Every benchmark first checks its result against the golden result of the
+synthetic inputs, then measures the throughput (calls per second, best of
+several repeats), the peak memory allocated by a single call and the number of
+memory blocks a single call leaves allocated. The run fails if a result is
+wrong, or if the throughput dropped or the peak memory or number of blocks grew
+by more than the threshold compared to the stored baseline.
+
+    python -m benchmarks.bench_scoring                    # check against the baseline
+    python -m benchmarks.bench_scoring --update-baseline  # store a new baseline
+
+The baseline is machine specific, store it on the machine that runs the gate.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from benchmarks.inputs import (
+    DMP_V1_TABLES,
+    PARSE_CHECKBOXES_CASES,
+    PROJECT_INFO_CASES,
+    SCORE_DMP_V2_CASES,
+    SCORE_SINGLE_DMP_V1_CASES,
+    TEXT_IS_NOT_DEFAULT_CASES,
+    write_dmp_v1_docx,
+)
+from dmpt.dmp_v1 import read_tables, score_single_dmp_v1
+from dmpt.dmp_v2 import score_dmp_v2
+from dmpt.tools.parsers import parse_checkboxes, project_info, text_is_not_default
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25  # fraction
+DEFAULT_MIN_TIME = 0.2  # seconds per repeat
+REPEATS = 5
+
+
+def benchmark_cases(docx_path: str) -> dict[str, tuple[Callable[[], Any], Any]]:
+    """
+    Returns the benchmarks: name -> (function without arguments, golden result).
+
+    Args:
+        docx_path (str): Path to the Word document with the tables of DMP_V1_TABLES.
+    Returns:
+        dict[str, tuple[Callable[[], Any], Any]]: The benchmarks.
+    """
+    cases = {
+        "parse_checkboxes": (
+            lambda: [parse_checkboxes(text) for text in PARSE_CHECKBOXES_CASES],
+            list(PARSE_CHECKBOXES_CASES.values()),
+        ),
+        "project_info": (
+            lambda: [project_info(text) for text in PROJECT_INFO_CASES],
+            list(PROJECT_INFO_CASES.values()),
+        ),
+        "text_is_not_default": (
+            lambda: [text_is_not_default(text) for text in TEXT_IS_NOT_DEFAULT_CASES],
+            list(TEXT_IS_NOT_DEFAULT_CASES.values()),
+        ),
+        "read_tables": (lambda: read_tables(docx_path), DMP_V1_TABLES),
+    }
+    for name, (values, expected) in SCORE_DMP_V2_CASES.items():
+        cases[f"score_dmp_v2[{name}]"] = (lambda values=values: score_dmp_v2(values), expected)
+    for name, (tables, expected) in SCORE_SINGLE_DMP_V1_CASES.items():
+        cases[f"score_single_dmp_v1[{name}]"] = (lambda tables=tables: score_single_dmp_v1(tables), expected)
+    return cases
+
+
+def matches(result: Any, expected: Any) -> bool:
+    """Compares a result to the golden result, with a tolerance for floats."""
+    if isinstance(expected, (tuple, list)) and isinstance(result, (tuple, list)):
+        return len(result) == len(expected) and all(matches(r, e) for r, e in zip(result, expected))
+    if isinstance(expected, float) or isinstance(result, float):
+        return math.isclose(result, expected, rel_tol=1e-9)
+    return result == expected
+
+
+def measure(function: Callable[[], Any], min_time: float = DEFAULT_MIN_TIME) -> dict[str, float]:
+    """
+    Measures the throughput and memory use of a function.
+
+    Args:
+        function (Callable[[], Any]): The function to measure.
+        min_time (float): Minimum duration of each of the timed repeats in seconds.
+    Returns:
+        dict[str, float]: The calls per second (best repeat), the peak memory of one call in bytes
+            and the number of memory blocks allocated by one call that are still allocated after it.
+    """
+    # Find the number of calls that takes at least min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    best = elapsed / number
+    for _ in range(REPEATS - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        function()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # Leave out the memory of the first snapshot itself
+    ignore_tracemalloc = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    before = before.filter_traces(ignore_tracemalloc)
+    differences = after.filter_traces(ignore_tracemalloc).compare_to(before, "lineno")
+    allocated_blocks = sum(difference.count_diff for difference in differences if difference.count_diff > 0)
+
+    return {"ops_per_sec": 1 / best, "peak_bytes": peak_bytes, "allocated_blocks": allocated_blocks}
+
+
+def compare_to_baseline(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[str]:
+    """
+    Compares benchmark results to the baseline.
+
+    Args:
+        results (dict[str, dict[str, float]]): The measured results per benchmark.
+        baseline (dict[str, dict[str, float]]): The baseline results per benchmark.
+        threshold (float): The allowed relative drop in throughput and growth in peak memory
+                           and allocated blocks. Baselines without allocated blocks only
+                           check the throughput and peak memory.
+    Returns:
+        list[str]: A description of every regression, empty if there are none.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['ops_per_sec']:,.0f} ops/s is more than {threshold:.0%} below "
+                f"the baseline of {base['ops_per_sec']:,.0f} ops/s"
+            )
+        if result["peak_bytes"] > base["peak_bytes"] * (1 + threshold):
+            regressions.append(
+                f"{name}: peak memory of {result['peak_bytes']:,.0f} bytes is more than {threshold:.0%} "
+                f"above the baseline of {base['peak_bytes']:,.0f} bytes"
+            )
+        if "allocated_blocks" in base and result["allocated_blocks"] > base["allocated_blocks"] * (1 + threshold):
+            regressions.append(
+                f"{name}: {result['allocated_blocks']:,} allocated blocks is more than {threshold:.0%} "
+                f"above the baseline of {base['allocated_blocks']:,} blocks"
+            )
+    return regressions
+
+
+def run_benchmarks(min_time: float = DEFAULT_MIN_TIME) -> tuple[dict[str, dict[str, float]], list[str]]:
+    """
+    Checks and measures all benchmarks.
+
+    Args:
+        min_time (float): Minimum duration of each of the timed repeats in seconds.
+    Returns:
+        tuple[dict[str, dict[str, float]], list[str]]: The results per benchmark, and the
+            names of the benchmarks whose result differs from the golden result.
+    """
+    results = dict()
+    wrong = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        docx_path = write_dmp_v1_docx(os.path.join(temp_dir, "123456789-BGS_v1.1-data-management-plan.docx"))
+        for name, (function, expected) in benchmark_cases(docx_path).items():
+            if not matches(function(), expected):
+                wrong.append(name)
+                continue
+            results[name] = measure(function, min_time)
+            print(
+                f"{name:<45} {results[name]['ops_per_sec']:>14,.0f} ops/s {results[name]['peak_bytes']:>12,} bytes "
+                f"{results[name]['allocated_blocks']:>8,} blocks"
+            )
+    return results, wrong
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Path to the baseline JSON file.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed relative regression. Default: {DEFAULT_THRESHOLD}",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=DEFAULT_MIN_TIME,
+        help=f"Minimum duration of each timed repeat in seconds. Default: {DEFAULT_MIN_TIME}",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+    args = parser.parse_args(argv)
+
+    results, wrong = run_benchmarks(args.min_time)
+    if wrong:
+        print(f"Result differs from the golden result: {', '.join(wrong)}")
+        return 1
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline found at {args.baseline}, run with --update-baseline first")
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
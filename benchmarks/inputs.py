@@ -0,0 +1,128 @@
+"""
+Fixed synthetic inputs for the parsers and scorers, together with their
+golden (expected) results. Used by the tests and by the benchmarks.
+"""
+
+import os
+
+from docx import Document
+
+CHECKED_YES = "☒ Yes ☐ No"
+CHECKED_NO = "☐ Yes ☒ No"
+UNCHECKED = "☐ Yes ☐ No"
+DEFAULT_TEXT = "Click here to enter text."
+
+# input -> expected result
+PARSE_CHECKBOXES_CASES = {
+    CHECKED_YES: {"Yes": True, "No": False},
+    CHECKED_NO: {"Yes": False, "No": True},
+    UNCHECKED: {"Yes": False, "No": False},
+    "\u200b☒ Yes\u200b ☒ No": {"Yes": True, "No": True},
+    "": {"Yes": False, "No": False},
+}
+PROJECT_INFO_CASES = {
+    "Project lead: Jane Doe\nProject number: 11200500": {
+        "Project leader": "Jane Doe",
+        "Project number": "11200500",
+    },
+    "Project lead: Jane Doe\nProject number: ": {"Project leader": "Jane Doe"},
+    DEFAULT_TEXT: {},
+}
+TEXT_IS_NOT_DEFAULT_CASES = {
+    "Raw data is stored on the project share.": True,
+    DEFAULT_TEXT: False,
+    "": True,
+}
+
+DMP_V2_COMPLETE = {
+    "1.1": "Project lead: Jane Doe\nProject number: 11200500",
+    **{key: CHECKED_YES for key in ("1.2", "1.3", "1.4", "1.5", "1.6", "1.8", "1.9", "1.10", "1.12", "1.13", "1.14")},
+    "1.7": "Model input from the national database.",
+    "1.11": "Raw data is stored on the project share.",
+    "4.1": "Data is published in the data catalogue.",
+    "4.2": "Open access after the project ends.",
+    "4.3": "NetCDF following the CF conventions.",
+    "4.4": "CC-BY 4.0 license.",
+}
+DMP_V2_PARTIAL = {
+    **DMP_V2_COMPLETE,
+    "1.1": "Project lead: Jane Doe\nProject number: ",
+    "1.2": UNCHECKED,
+    "1.3": UNCHECKED,
+    "1.4": UNCHECKED,
+    "1.6": CHECKED_NO,
+    "1.7": DEFAULT_TEXT,
+    "1.12": UNCHECKED,
+    "1.13": UNCHECKED,
+    "1.14": UNCHECKED,
+    "4.2": DEFAULT_TEXT,
+    "4.3": "",
+}
+DMP_V2_NO_DATA = {**DMP_V2_PARTIAL, "1.5": CHECKED_NO}
+
+SCORE_DMP_V2_CASES = {
+    "complete": (DMP_V2_COMPLETE, (100.0, 100.0, 100.0)),
+    "partial": (DMP_V2_PARTIAL, (40.0, 50.0, 45.0)),
+    "no_data": (DMP_V2_NO_DATA, (100, 100, 100)),
+}
+
+# Tables of a v1 DMP, indexed like the tables in the Word document
+DMP_V1_TABLES = {
+    0: [["Data Management Plan"]],
+    1: [["Version", "1.1"]],
+    2: [
+        ["1.1 Title, abstract and participants", "Coastal flood risk assessment"],
+        ["1.2 Funding", "Internal"],
+        ["1.3 Duration", ""],
+        ["1.4 Data and code used", "Bathymetry and water levels"],
+        ["1.5 Costs", ""],
+        ["1.6 Data and code generated", "Model schematisations"],
+        ["1.7 Ethical and legal considerations", ""],
+    ],
+    3: [
+        ["Name", "Source", "License"],
+        ["Bathymetry", "National survey", "Open"],
+    ],
+    4: [
+        ["Name", "Storage", "Size"],
+        ["", "", ""],
+    ],
+    5: [["2. Roles"]],
+    6: [
+        ["4.1 Findable", "Registered in the data catalogue"],
+        ["4.2 Accessible", "Open"],
+        ["4.3 Interoperable", "NetCDF following the CF conventions"],
+        ["4.4 Reusable", "CC-BY 4.0 license"],
+        ["5.3 Sharing and preservation", "Archived"],
+    ],
+    7: [["6. Costs", ""]],
+}
+SCORE_SINGLE_DMP_V1_CASES = {
+    "partial": (DMP_V1_TABLES, (0.6, 8 / 6, 14 / 16)),
+    "empty_generated_and_fair": (
+        {**DMP_V1_TABLES, 3: DMP_V1_TABLES[3][:1], 6: [[row[0], ""] for row in DMP_V1_TABLES[6]]},
+        (0.3, 0.0, 3 / 16),
+    ),
+}
+
+
+def write_dmp_v1_docx(path: str, tables: dict[int, list[list[str]]] = DMP_V1_TABLES) -> str:
+    """
+    Writes a Word document with the given tables, in order of their index.
+
+    Args:
+        path (str): The path of the document to write.
+        tables (dict[int, list[list[str]]]): The tables to write.
+    Returns:
+        str: The path of the written document.
+    """
+    document = Document()
+    for index in sorted(tables):
+        rows = tables[index]
+        table = document.add_table(rows=len(rows), cols=len(rows[0]))
+        for row, values in zip(table.rows, rows):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    document.save(path)
+    return path
@@ -0,0 +1,125 @@
+import datetime
+import os
+import pickle
+import uuid
+from typing import Any
+
+ARTIFACT_VERSION = 2
+DEFAULT_CACHE_DIR = os.path.join(os.getenv("PATH_TO_DATA", "data"), "cache")
+DEFAULT_TTL_HOURS = float(os.getenv("CACHE_TTL_HOURS", "24"))
+
+
+def artifact_path(stage: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """
+    Returns the path of the artifact file for a pipeline stage.
+
+    Args:
+        stage (str): The name of the pipeline stage (e.g. "fetch", "score").
+        cache_dir (str): The directory holding the cached artifacts.
+
+    Returns:
+        str: Full path to the artifact file.
+    """
+    return os.path.join(cache_dir, f"{stage}.pkl")
+
+
+def save_artifact(
+    stage: str,
+    data: Any,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    inputs: dict[str, str] | None = None,
+) -> str:
+    """
+    Persists the output of a pipeline stage together with the artifact version,
+    the time it was created, a unique id and the ids of the artifacts it was
+    computed from.
+
+    Args:
+        stage (str): The name of the pipeline stage.
+        data (Any): The (picklable) output of the stage.
+        cache_dir (str): The directory holding the cached artifacts.
+        inputs (dict[str, str] | None): Stage name -> id of the input artifacts of the stage.
+
+    Returns:
+        str: The id of the written artifact.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = artifact_path(stage, cache_dir)
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "stage": stage,
+        "id": uuid.uuid4().hex,
+        "created": datetime.datetime.now(),
+        "inputs": dict(inputs or {}),
+        "data": data,
+    }
+    # Write to a temporary file first so an interrupted run never leaves a
+    # truncated artifact behind
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+    return artifact["id"]
+
+
+def load_artifact_record(
+    stage: str,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    ttl_hours: float | None = DEFAULT_TTL_HOURS,
+) -> dict[str, Any] | None:
+    """
+    Loads the cached artifact of a pipeline stage, including its metadata.
+
+    Args:
+        stage (str): The name of the pipeline stage.
+        cache_dir (str): The directory holding the cached artifacts.
+        ttl_hours (float | None): Maximum age of the artifact in hours. None disables the check.
+
+    Returns:
+        dict[str, Any] | None: The artifact with the keys "id", "created", "inputs" and "data",
+                               or None if the artifact is missing, expired or was written by an
+                               incompatible artifact version.
+    """
+    path = artifact_path(stage, cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            artifact = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        print(f"Ignoring unreadable artifact {path}: {e}")
+        return None
+
+    if artifact.get("version") != ARTIFACT_VERSION:
+        return None
+
+    if ttl_hours is not None:
+        age = datetime.datetime.now() - artifact["created"]
+        if age > datetime.timedelta(hours=ttl_hours):
+            return None
+
+    return artifact
+
+
+def load_artifact(
+    stage: str,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    ttl_hours: float | None = DEFAULT_TTL_HOURS,
+) -> Any | None:
+    """
+    Loads the cached output of a pipeline stage.
+
+    Args:
+        stage (str): The name of the pipeline stage.
+        cache_dir (str): The directory holding the cached artifacts.
+        ttl_hours (float | None): Maximum age of the artifact in hours. None disables the check.
+
+    Returns:
+        Any | None: The cached data, or None if the artifact is missing, expired
+                    or was written by an incompatible artifact version.
+    """
+    artifact = load_artifact_record(stage, cache_dir, ttl_hours)
+    if artifact is None:
+        return None
+    return artifact["data"]
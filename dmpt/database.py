@@ -1,10 +1,32 @@
+import datetime
+import os
 import sqlite3
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+DEFAULT_DB_PATH = os.getenv("DB_PATH", "data/dmp_data.db")
+# Columns of the project_status table that the DMP scores are rolled up by
+ROLLUP_DIMENSIONS = [
+    "responsible_department",
+    "business_area",
+    "project_type",
+    "quote_status",
+]
+# Column names of the merged output -> columns of the project_status table
+PROJECT_STATUS_COLUMNS = {
+    "ProjectNumber": "project_number",
+    "ResponsibleDepartment": "responsible_department",
+    "BusinessArea": "business_area",
+    "ProjectType": "project_type",
+    "Quote_Status": "quote_status",
+    "total_score": "total_score",
+}
+ROLLUP_PERCENTILES = [25, 50, 75, 90]
 
-def init_db(db_path: str = "data/dmp_data.db") -> None:
+
+def init_db(db_path: str = DEFAULT_DB_PATH) -> None:
     """Initialize the SQLite database with the required tables."""
     # Ensure the data directory exists
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
@@ -44,12 +66,28 @@ def init_db(db_path: str = "data/dmp_data.db") -> None:
         )
     """
     )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dmp_scores (
+            project_number INTEGER PRIMARY KEY,
+            dmp_path TEXT,
+            dmp_mtime REAL,
+            score1 REAL,
+            score2 REAL,
+            total_score REAL,
+            dmp_date_created TIMESTAMP,
+            dmp_date_modified TIMESTAMP,
+            date_scored TIMESTAMP
+        )
+    """
+    )
+    init_rollups(cursor)
 
     conn.commit()
     conn.close()
 
 
-def write_projects_to_db(df: pd.DataFrame, db_path: str = "data/dmp_data.db") -> None:
+def write_projects_to_db(df: pd.DataFrame, db_path: str = DEFAULT_DB_PATH) -> None:
     """Write the projects DataFrame to the SQLite database."""
     conn = sqlite3.connect(db_path)
 
@@ -57,3 +95,275 @@ def write_projects_to_db(df: pd.DataFrame, db_path: str = "data/dmp_data.db") ->
     df.to_sql("projects", conn, if_exists="replace", index=False)
 
     conn.close()
+
+
+def upsert_dmp_scores(rows: list[dict], db_path: str = DEFAULT_DB_PATH) -> None:
+    """
+    Insert or update the scores of individual DMPs, keyed on the project number.
+
+    Args:
+        rows (list[dict]): One dictionary per DMP with the columns of the dmp_scores table.
+                           `date_scored` is filled in if missing.
+        db_path (str): The path to the SQLite database.
+    """
+    if not rows:
+        return
+
+    columns = [
+        "project_number",
+        "dmp_path",
+        "dmp_mtime",
+        "score1",
+        "score2",
+        "total_score",
+        "dmp_date_created",
+        "dmp_date_modified",
+        "date_scored",
+    ]
+    now = datetime.datetime.now().isoformat(sep=" ")
+    values = [
+        tuple(
+            _to_sql_value(row.get(col, now if col == "date_scored" else None))
+            for col in columns
+        )
+        for row in rows
+    ]
+    updates = ", ".join(f"{col} = excluded.{col}" for col in columns[1:])
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(
+            f"""
+            INSERT INTO dmp_scores ({", ".join(columns)})
+            VALUES ({", ".join("?" for _ in columns)})
+            ON CONFLICT(project_number) DO UPDATE SET {updates}
+            """,
+            values,
+        )
+        # Keep the rollups up to date for the projects that are already tracked
+        conn.executemany(
+            "UPDATE project_status SET has_dmp = 1, total_score = ? WHERE project_number = ?",
+            [(value[columns.index("total_score")], value[0]) for value in values],
+        )
+    conn.close()
+
+
+def read_dmp_file_state(db_path: str = DEFAULT_DB_PATH) -> dict[int, tuple[str, float]]:
+    """
+    Returns the path and modification time of the DMP file every stored score is based on.
+
+    Args:
+        db_path (str): The path to the SQLite database.
+    Returns:
+        dict[int, tuple[str, float]]: Project number -> (DMP path, modification time in seconds).
+    """
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT project_number, dmp_path, dmp_mtime FROM dmp_scores").fetchall()
+    conn.close()
+    return {project_number: (path, mtime) for project_number, path, mtime in rows}
+
+
+def init_rollups(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the project_status table and the rollup tables, together with the
+    triggers that keep the rollups up to date.
+
+    Every insert, update or delete of a project in project_status adds or
+    subtracts its contribution to the rollup row of its department, business
+    area, project type and quote status. A rollup row holds the number of
+    projects, the number with a DMP, the number with a valid score and the sum
+    of the scores. The distribution of the scores is kept as a histogram with
+    bins of 1 point, so percentiles are read from at most 101 rows.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS project_status (
+            project_number INTEGER PRIMARY KEY,
+            responsible_department TEXT,
+            business_area TEXT,
+            project_type TEXT,
+            quote_status TEXT,
+            has_dmp INTEGER NOT NULL DEFAULT 0,
+            total_score REAL
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dmp_rollups (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            projects INTEGER NOT NULL,
+            with_dmp INTEGER NOT NULL,
+            scored INTEGER NOT NULL,
+            score_sum REAL NOT NULL,
+            PRIMARY KEY (dimension, value)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dmp_rollup_histogram (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            bin INTEGER NOT NULL,
+            projects INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value, bin)
+        )
+    """
+    )
+
+    changed = " OR ".join(
+        f"OLD.{col} IS NOT NEW.{col}" for col in ROLLUP_DIMENSIONS + ["has_dmp", "total_score"]
+    )
+    triggers = {
+        "project_status_insert": ("AFTER INSERT", _rollup_statements("NEW", 1)),
+        "project_status_delete": ("AFTER DELETE", _rollup_statements("OLD", -1)),
+        "project_status_update": (
+            "AFTER UPDATE",
+            _rollup_statements("OLD", -1) + _rollup_statements("NEW", 1),
+        ),
+    }
+    for name, (event, statements) in triggers.items():
+        condition = f"WHEN {changed}" if event == "AFTER UPDATE" else ""
+        cursor.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {name} {event} ON project_status {condition}
+            BEGIN
+                {" ".join(statements)}
+            END
+        """
+        )
+
+
+def _rollup_statements(row: str, sign: int) -> list[str]:
+    # Adds (sign 1) or subtracts (sign -1) the contribution of a project row to the rollups
+    is_scored = f"(CASE WHEN {row}.total_score >= 0 THEN 1 ELSE 0 END)"
+    score = f"(CASE WHEN {row}.total_score >= 0 THEN {row}.total_score ELSE 0 END)"
+    score_bin = f"MIN(CAST({row}.total_score AS INTEGER), 100)"
+
+    statements = []
+    for dimension in ROLLUP_DIMENSIONS:
+        value = f"COALESCE({row}.{dimension}, '')"
+        statements.append(
+            f"""
+            INSERT INTO dmp_rollups (dimension, value, projects, with_dmp, scored, score_sum)
+            VALUES ('{dimension}', {value}, {sign}, {sign} * {row}.has_dmp, {sign} * {is_scored}, {sign} * {score})
+            ON CONFLICT(dimension, value) DO UPDATE SET
+                projects = projects + excluded.projects,
+                with_dmp = with_dmp + excluded.with_dmp,
+                scored = scored + excluded.scored,
+                score_sum = score_sum + excluded.score_sum;
+            """
+        )
+        statements.append(
+            f"""
+            INSERT INTO dmp_rollup_histogram (dimension, value, bin, projects)
+            SELECT '{dimension}', {value}, {score_bin}, {sign}
+            WHERE {row}.total_score >= 0
+            ON CONFLICT(dimension, value, bin) DO UPDATE SET
+                projects = projects + excluded.projects;
+            """
+        )
+    return statements
+
+
+def upsert_project_status(df: pd.DataFrame, db_path: str = DEFAULT_DB_PATH) -> None:
+    """
+    Insert or update the department, business area, project type, quote status
+    and DMP score of projects. The rollups are updated incrementally for the
+    projects that changed.
+
+    Args:
+        df (pd.DataFrame): The merged project data and DMP scores, with the columns
+                           ProjectNumber, ResponsibleDepartment, BusinessArea, ProjectType,
+                           Quote_Status and total_score. Projects without a DMP have no total_score.
+        db_path (str): The path to the SQLite database.
+    """
+    df = df[[col for col in PROJECT_STATUS_COLUMNS if col in df.columns]].rename(columns=PROJECT_STATUS_COLUMNS)
+    df = df.reindex(columns=list(PROJECT_STATUS_COLUMNS.values()))
+    df = df.assign(has_dmp=df.total_score.notna().astype(int))
+    df = df.astype(object).where(df.notna(), None)
+
+    columns = list(df.columns)
+    updates = ", ".join(f"{col} = excluded.{col}" for col in columns[1:])
+    values = [tuple(_to_sql_value(value) for value in row) for row in df.itertuples(index=False)]
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(
+            f"""
+            INSERT INTO project_status ({", ".join(columns)})
+            VALUES ({", ".join("?" for _ in columns)})
+            ON CONFLICT(project_number) DO UPDATE SET {updates}
+            """,
+            values,
+        )
+    conn.close()
+
+
+def get_rollup(dimension: str, value: str, db_path: str = DEFAULT_DB_PATH) -> dict[str, float | int | None]:
+    """
+    Returns the rolled up DMP coverage and scores of the projects with the given
+    value of a dimension, e.g. all projects of one department.
+
+    Args:
+        dimension (str): One of ROLLUP_DIMENSIONS.
+        value (str): The value of the dimension, e.g. a department code.
+        db_path (str): The path to the SQLite database.
+    Returns:
+        dict[str, float | int | None]: The number of projects, the number with and without
+            a DMP, the number with a valid score, the mean score and the score percentiles
+            (p25, p50, p75, p90, with a resolution of 1 point). Scores are None if no
+            project has a valid score.
+    """
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise ValueError(f"Unknown rollup dimension: {dimension}. Choose from {', '.join(ROLLUP_DIMENSIONS)}")
+
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(
+        "SELECT projects, with_dmp, scored, score_sum FROM dmp_rollups WHERE dimension = ? AND value = ?",
+        (dimension, value),
+    ).fetchone()
+    histogram = conn.execute(
+        """
+        SELECT bin, projects FROM dmp_rollup_histogram
+        WHERE dimension = ? AND value = ? AND projects > 0
+        ORDER BY bin
+        """,
+        (dimension, value),
+    ).fetchall()
+    conn.close()
+
+    projects, with_dmp, scored, score_sum = row if row is not None else (0, 0, 0, 0.0)
+    rollup = {
+        "projects": projects,
+        "with_dmp": with_dmp,
+        "without_dmp": projects - with_dmp,
+        "scored": scored,
+        "mean_score": score_sum / scored if scored else None,
+    }
+    for percentile in ROLLUP_PERCENTILES:
+        rollup[f"p{percentile}"] = _histogram_percentile(histogram, scored, percentile)
+    return rollup
+
+
+def _histogram_percentile(histogram: list[tuple[int, int]], total: int, percentile: float) -> int | None:
+    # Nearest-rank percentile over the (bin, count) pairs, sorted by bin
+    if total <= 0:
+        return None
+    rank = max(1, -(-percentile * total // 100))
+    cumulative = 0
+    for score_bin, count in histogram:
+        cumulative += count
+        if cumulative >= rank:
+            return score_bin
+    return histogram[-1][0] if histogram else None
+
+
+def _to_sql_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat(sep=" ")
+    return value
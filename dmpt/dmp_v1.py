@@ -10,7 +10,7 @@ Created on Mon Feb 19 14:04:35 2024
 import os
 
 from docx import Document
-from typing import List, Tuple, Dict, Optional
+from typing import IO, List, Tuple, Dict, Optional, Union
 
 TARGET_TABLES = [2, 3, 4, 6, 7, 8]
 PROJECT_FOLDER = "Project_BGS"
@@ -18,14 +18,14 @@ MAIL_FOLDER = "Mail_BGS"
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
-def read_tables(doc_path: str, target_tables: Optional[List[int]] = None) -> Dict[int, List[str]]:
+def read_tables(doc_path: Union[str, IO[bytes]], target_tables: Optional[List[int]] = None) -> Dict[int, List[str]]:
     """
     Read the tables from a Word document and return the content of the tables as a
     dictionary. The tables are identified by their index in the document. The
     function returns only the tables that are specified in the `target_tables`.
 
     Args:
-        doc_path (str): The path to the Word document
+        doc_path (Union[str, IO[bytes]]): The path to the Word document, or the document as a file-like object
         target_tables (List[int], optional): The indices of the tables to be extracted. Defaults to None.
 
     Returns:
@@ -130,13 +130,13 @@ def score_single_dmp_v1(tables: Dict[int, List[str]]) -> Tuple[float, float, flo
     )
 
 
-def read_and_score_dmp_v1(filename: str) -> Tuple[float, float, float]:
+def read_and_score_dmp_v1(filename: Union[str, IO[bytes]]) -> Tuple[float, float, float]:
     """
     Read the tables from a Word document and score the DMP based on the content of the
     tables.
 
     Args:
-        filename (str): The path to the Word document
+        filename (Union[str, IO[bytes]]): The path to the Word document, or the document as a file-like object
 
     Returns:
         Tuple[float, float, float]: The score for each part and the total score
@@ -1,7 +1,5 @@
 import re
 
-import win32com.client
-
 from dmpt.tools.parsers import parse_checkboxes, project_info, text_is_not_default
 
 
@@ -23,6 +21,9 @@ def read_dmp_file(dmp_file: str) -> dict[str, str]:
     6. Closes the document and the Word application.
     7. Uses a regular expression to match section numbers and constructs a dictionary with the extracted content.
     """
+    # Imported here so the scoring modules can be imported on systems without Word
+    import win32com.client
+
     # Rebuild the win32com cache
     win32com.client.gencache.is_readonly = False
     win32com.client.gencache.Rebuild()
@@ -0,0 +1,169 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Low-cardinality columns of the API data that are stored as categoricals
+CATEGORICAL_COLUMNS = [
+    "Unit",
+    "ResponsibleDepartment",
+    "ResponsibleDepartmentDescription",
+    "ProjectType",
+    "ProjectTypeDescription",
+    "Financier",
+    "BusinessArea",
+    "BusinessAreaDescription",
+    "Status_API",
+    "Quote_Status",
+]
+MERGE_INDICATOR_CATEGORIES = ["left_only", "right_only", "both"]
+
+
+def parquet_available() -> bool:
+    """Returns True if pyarrow is installed and Parquet files can be written."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def merge_projects(df_api: pd.DataFrame, dmps_table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Combines the project data with the DMP scores with an outer join on the
+    integer project number. Both tables are indexed on the project number so
+    the join is done on the index instead of on a column.
+
+    Args:
+        df_api (pd.DataFrame): The processed project data from the API.
+        dmps_table (pd.DataFrame): The DMP scores and dates per project number.
+    Returns:
+        pd.DataFrame: The combined table with a `ProjectNumber` column and a
+                      categorical `_merge` column ('left_only', 'right_only' or 'both'),
+                      like `pd.merge(..., indicator=True)`.
+    """
+    left = df_api.set_index(df_api.ProjectNumber.astype("int64")).drop(columns="ProjectNumber")
+    right = dmps_table.set_index(dmps_table.ProjectNumber.astype("int64")).drop(columns="ProjectNumber")
+
+    df_total = left.join(right, how="outer")
+
+    in_left = df_total.index.isin(left.index)
+    in_right = df_total.index.isin(right.index)
+    df_total["_merge"] = pd.Categorical(
+        np.select([in_left & in_right, in_left], ["both", "left_only"], default="right_only"),
+        categories=MERGE_INDICATOR_CATEGORIES,
+    )
+
+    df_total.index.name = "ProjectNumber"
+    return df_total.reset_index()
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts the low-cardinality text columns to categoricals. Datetime columns
+    are left untouched so their type is preserved in the output file.
+
+    Args:
+        df (pd.DataFrame): The table to convert.
+    Returns:
+        pd.DataFrame: A copy of the table with categorical columns.
+    """
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def output_path_for_format(output_path: str) -> str:
+    """
+    Returns the path the output is actually written to. Parquet output falls
+    back to a gzip compressed CSV file if pyarrow is not installed.
+
+    Args:
+        output_path (str): The requested output path (.parquet, .csv or .csv.gz).
+    Returns:
+        str: The path of the file that will be written.
+    """
+    if output_path.endswith(".parquet") and not parquet_available():
+        fallback_path = output_path.removesuffix(".parquet") + ".csv.gz"
+        print(f"pyarrow is not installed, writing {fallback_path} instead of {output_path}")
+        return fallback_path
+    return output_path
+
+
+def write_output(df: pd.DataFrame, output_path: str) -> str:
+    """
+    Writes the table to Parquet, or to a (compressed) CSV file depending on the
+    file extension.
+
+    Args:
+        df (pd.DataFrame): The table to write.
+        output_path (str): The output path (.parquet, .csv or .csv.gz).
+    Returns:
+        str: The path of the file that was written.
+    """
+    output_path = output_path_for_format(output_path)
+    with OutputWriter(output_path) as writer:
+        writer.write(df)
+    return output_path
+
+
+class OutputWriter:
+    """
+    Writes a table in parts as results arrive. Every call to `write` is stored
+    as a separate row group in a Parquet file, or appended to a CSV file.
+    All parts must have the same columns.
+
+    Example:
+        with OutputWriter("data/output.parquet") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path_for_format(output_path)
+        self.is_parquet = self.output_path.endswith(".parquet")
+        self._parquet_writer = None
+        self._schema = None
+        self._rows_written = 0
+
+    def __enter__(self) -> "OutputWriter":
+        os.makedirs(os.path.dirname(self.output_path) or ".", exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Writes a part of the table."""
+        df = optimize_dtypes(df)
+        if self.is_parquet:
+            self._write_parquet(df)
+        else:
+            df.to_csv(
+                self.output_path,
+                index=False,
+                mode="w" if self._rows_written == 0 else "a",
+                header=self._rows_written == 0,
+            )
+        self._rows_written += len(df)
+
+    def _write_parquet(self, df: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._parquet_writer is None:
+            self._schema = table.schema
+            self._parquet_writer = pq.ParquetWriter(self.output_path, self._schema, compression="zstd")
+        else:
+            # Categoricals of later parts can have a different dictionary index width
+            table = table.cast(self._schema)
+        self._parquet_writer.write_table(table)
+
+    def close(self) -> None:
+        """Closes the output file."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
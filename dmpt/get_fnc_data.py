@@ -1,15 +1,23 @@
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+import datetime
 import os
+import time
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 
 load_dotenv()
 API_URL = os.getenv("API_URL")
 if API_URL is None:
     raise ValueError("API_URL environment variable is not set.")
 
+API_DATE_FORMAT = "%Y.%m.%d"
+# Query parameter for the upper bound of the date range of a window
+UNTIL_DATE_PARAM = os.getenv("API_UNTIL_PARAM", "until_date")
+
 def call_dmp_api(
     api_url: str = API_URL,
     since_date: str = "2023.11.01",
@@ -125,3 +133,210 @@ def process_api_data(projects: List[Dict]) -> pd.DataFrame:
     )
 
     return df
+
+
+
+def date_windows(
+    since_date: str,
+    until_date: Optional[str] = None,
+    window_days: int = 90,
+) -> List[Tuple[str, str]]:
+    """
+    Split a date range into consecutive windows. Consecutive windows share their
+    boundary date, so no project is missed whether the API bounds are inclusive
+    or exclusive; duplicates are removed by `deduplicate_projects`.
+
+    Args:
+        since_date (str): Start of the range (yyyy.mm.dd)
+        until_date (str, optional): End of the range (yyyy.mm.dd). Defaults to tomorrow.
+        window_days (int): Length of a window in days
+
+    Returns:
+        List[Tuple[str, str]]: (since, until) date strings (yyyy.mm.dd) of every window
+    """
+    if window_days < 1:
+        raise ValueError(f"window_days must be at least 1, got {window_days}")
+
+    start = datetime.datetime.strptime(since_date, API_DATE_FORMAT).date()
+    if until_date is None:
+        end = datetime.date.today() + datetime.timedelta(days=1)
+    else:
+        end = datetime.datetime.strptime(until_date, API_DATE_FORMAT).date()
+
+    windows = []
+    while start < end:
+        window_end = min(start + datetime.timedelta(days=window_days), end)
+        windows.append((start.strftime(API_DATE_FORMAT), window_end.strftime(API_DATE_FORMAT)))
+        start = window_end
+    return windows
+
+
+def deduplicate_projects(projects: List[Dict]) -> List[Dict]:
+    """
+    Keep one entry per ProjectNumber: the one with the latest DateModified.
+
+    Args:
+        projects (List[Dict]): Project dictionaries, possibly with duplicate project numbers
+
+    Returns:
+        List[Dict]: Project dictionaries with unique project numbers, in order of first appearance
+    """
+
+    def date_modified(project: Dict) -> pd.Timestamp:
+        timestamp = pd.to_datetime(project.get("DateModified"), errors="coerce", utc=True)
+        return pd.Timestamp.min.tz_localize("UTC") if pd.isna(timestamp) else timestamp
+
+    latest = dict()
+    for project in projects:
+        key = project.get("ProjectNumber")
+        if key not in latest or date_modified(project) > date_modified(latest[key]):
+            latest[key] = project
+    return list(latest.values())
+
+
+def in_window(project: Dict, since_date: str, until_date: str) -> bool:
+    """
+    Check whether a project was modified within a date window. One day of slack
+    is allowed on both sides for inclusive bounds and time zone differences.
+    Projects without a valid DateModified are considered to be in the window.
+
+    Args:
+        project (Dict): Project dictionary from the API
+        since_date (str): Start of the window (yyyy.mm.dd)
+        until_date (str): End of the window (yyyy.mm.dd)
+
+    Returns:
+        bool: False if the project was modified outside the window
+    """
+    timestamp = pd.to_datetime(project.get("DateModified"), errors="coerce", utc=True)
+    if pd.isna(timestamp):
+        return True
+    start = pd.Timestamp(datetime.datetime.strptime(since_date, API_DATE_FORMAT), tz="UTC")
+    end = pd.Timestamp(datetime.datetime.strptime(until_date, API_DATE_FORMAT), tz="UTC")
+    return start - pd.Timedelta(days=1) <= timestamp < end + pd.Timedelta(days=2)
+
+
+def fetch_window(
+    session: requests.Session,
+    api_url: str,
+    since_date: str,
+    until_date: str,
+    verify_ssl: bool = False,
+    timeout: float = 60,
+    retries: int = 3,
+) -> List[Dict]:
+    """
+    Request the projects of one date window, retrying with exponential backoff.
+
+    Args:
+        session (requests.Session): The session holding the connection pool
+        api_url (str): The URL of the DMP API
+        since_date (str): Start of the window (yyyy.mm.dd)
+        until_date (str): End of the window (yyyy.mm.dd)
+        verify_ssl (bool): Whether to verify SSL certificates
+        timeout (float): Timeout of a single request in seconds
+        retries (int): Number of retries after a failed request
+
+    Returns:
+        List[Dict]: The projects of the window
+
+    Raises:
+        requests.exceptions.RequestException, ValueError: If the last attempt failed
+    """
+    params = {"since_date": since_date, UNTIL_DATE_PARAM: until_date}
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(api_url, params=params, verify=verify_ssl, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+            if "projects" not in data:
+                raise ValueError(f"'projects' key not found in response. Response structure: {list(data.keys())}")
+            return data["projects"]
+        except (requests.exceptions.RequestException, ValueError) as e:
+            if attempt == retries:
+                raise
+            print(f"Retrying window {since_date} - {until_date} after error: {e}")
+            time.sleep(2**attempt)
+
+
+def call_dmp_api_windowed(
+    api_url: str = API_URL,
+    since_date: str = "2023.11.01",
+    until_date: Optional[str] = None,
+    window_days: int = 90,
+    max_workers: int = 4,
+    retries: int = 3,
+    verify_ssl: bool = False,
+) -> List[Dict]:
+    """
+    Call the DMP API with one request per date window instead of one request for
+    the whole range. The windows are requested concurrently over a bounded
+    connection pool and every window is retried independently. If a window still
+    fails, the other windows are completed before an error is raised, so the
+    caller never gets (and caches) an incomplete list.
+
+    Projects modified outside the window they were returned for are counted and
+    reported, but kept: the API does not document which date it filters on, so a
+    project can legitimately be returned by a window while modified later. If
+    every window returns many of them, the API probably ignores the upper bound of
+    the window, check the API_UNTIL_PARAM environment variable. Duplicates are
+    resolved by `deduplicate_projects`.
+
+    Args:
+        api_url (str): The URL of the DMP API
+        since_date (str): Start of the date range (yyyy.mm.dd)
+        until_date (str, optional): End of the date range (yyyy.mm.dd). Defaults to tomorrow.
+        window_days (int): Length of a window in days
+        max_workers (int): Maximum number of concurrent requests
+        retries (int): Number of retries of a failed window
+        verify_ssl (bool): Whether to verify SSL certificates. Default False for internal systems.
+
+    Returns:
+        List[Dict]: List of project dictionaries (see `call_dmp_api`), unique per ProjectNumber
+
+    Raises:
+        RuntimeError: If one or more windows failed after all retries
+    """
+    if not verify_ssl:
+        import urllib3
+
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    windows = date_windows(since_date, until_date, window_days)
+    print(f"Calling API URL: {api_url} in {len(windows)} windows of {window_days} days")
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def fetch(window: Tuple[str, str]) -> List[Dict]:
+        return fetch_window(session, api_url, window[0], window[1], verify_ssl, retries=retries)
+
+    projects = []
+    failed = []
+    outside = 0
+    with session, ThreadPoolExecutor(max_workers) as executor:
+        futures = {window: executor.submit(fetch, window) for window in windows}
+        for window, future in futures.items():
+            try:
+                window_projects = future.result()
+            except Exception as e:
+                print(f"Error calling API for window {window[0]} - {window[1]}: {e}")
+                failed.append(window)
+                continue
+            projects.extend(window_projects)
+            outside += sum(not in_window(project, *window) for project in window_projects)
+
+    if outside:
+        print(
+            f"Warning: {outside} projects were modified outside the window that returned them, check that "
+            f"the API supports the '{UNTIL_DATE_PARAM}' parameter (API_UNTIL_PARAM)"
+        )
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} of {len(windows)} windows failed: "
+            + ", ".join(f"{since} - {until}" for since, until in failed)
+        )
+
+    return deduplicate_projects(projects)
@@ -0,0 +1,365 @@
+import json
+import os
+import time
+from typing import Any
+
+import pandas as pd
+
+from dmpt.cache import DEFAULT_CACHE_DIR, DEFAULT_TTL_HOURS, load_artifact_record, save_artifact
+from dmpt.database import DEFAULT_DB_PATH, init_db, upsert_project_status
+from dmpt.export import merge_projects, write_output
+from dmpt.score_dmp_files import (
+    build_dmp_dataframe,
+    create_dmp_dictionary,
+    date_created,
+    date_modified,
+    read_and_score_dmps,
+)
+from dmpt.shard import DEFAULT_SHARD_DIR, combine_shards, score_shard
+from dmpt.tools.io_scheduler import scheduler_reports
+
+STAGES = ["fetch", "discover", "stat", "score", "merge", "export", "store"]
+
+
+def fetch() -> pd.DataFrame:
+    """Get the project data from the API and process it into a DataFrame."""
+    # get_fnc_data requires API_URL at import time, only the fetch stage needs it
+    from dmpt.get_fnc_data import call_dmp_api, call_dmp_api_windowed, process_api_data
+
+    # Split the request into date windows that are fetched concurrently if configured
+    window_days = int(os.getenv("API_WINDOW_DAYS", "0"))
+    if window_days > 0:
+        projects = call_dmp_api_windowed(
+            window_days=window_days,
+            max_workers=int(os.getenv("API_MAX_CONNECTIONS", "4")),
+        )
+    else:
+        projects = call_dmp_api()
+    # Raise instead of caching an empty table, which would break the next stages
+    if not projects:
+        raise ValueError("The API returned no projects, not caching the project data")
+    return process_api_data(projects)
+
+
+def discover(df_api: pd.DataFrame) -> dict[int, str]:
+    """Find the DMP file on the project share for every project."""
+    return create_dmp_dictionary(df_api)
+
+
+def stat(dmp: dict[int, str]) -> dict[str, dict[int, pd.Timestamp]]:
+    """Read the creation and modification dates of the DMP files."""
+    return {
+        "created": date_created(dmp),
+        "modified": date_modified(dmp),
+    }
+
+
+def score(dmp: dict[int, str]) -> dict[int, tuple[float, float, float]]:
+    """Read and score the DMP files."""
+    return read_and_score_dmps(dmp)
+
+
+def merge(
+    df_api: pd.DataFrame,
+    dmp: dict[int, str],
+    dmp_dates: dict[str, dict[int, pd.Timestamp]],
+    dmp_scores: dict[int, tuple[float, float, float]],
+) -> pd.DataFrame:
+    """Combine the scoring results with the project data on project number."""
+    dmps_table = build_dmp_dataframe(dmp, dmp_dates["created"], dmp_dates["modified"], dmp_scores)
+    return merge_projects(df_api, dmps_table)
+
+
+def export(df_total: pd.DataFrame) -> str:
+    """Write the merged table to the output folder and return the file path."""
+    output_folder = os.getenv("PATH_TO_DATA", "data")
+    output_filename = os.getenv("OUTPUT_FILENAME", "output.parquet")
+    return write_output(df_total, os.path.join(output_folder, output_filename))
+
+
+def store(df_total: pd.DataFrame, db_path: str = DEFAULT_DB_PATH) -> str:
+    """Upsert the merged table into the database, which updates the rollups, and return the database path."""
+    init_db(db_path)
+    upsert_project_status(df_total, db_path)
+    return db_path
+
+
+# Stage name -> (function, names of the stages whose output it takes as input)
+STAGE_DEFINITIONS = {
+    "fetch": (fetch, []),
+    "discover": (discover, ["fetch"]),
+    "stat": (stat, ["discover"]),
+    "score": (score, ["discover"]),
+    "merge": (merge, ["fetch", "discover", "stat", "score"]),
+    "export": (export, ["merge"]),
+    "store": (store, ["merge"]),
+}
+# Stage name -> names of the run settings it takes as keyword arguments
+STAGE_SETTINGS = {
+    "store": ["db_path"],
+}
+
+
+def run_stage(
+    stage: str,
+    results: dict[str, Any],
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    ttl_hours: float | None = DEFAULT_TTL_HOURS,
+    artifact_ids: dict[str, str] | None = None,
+    db_path: str = DEFAULT_DB_PATH,
+) -> Any:
+    """
+    Runs a single stage and persists its output as an artifact, together with
+    the ids of the input artifacts it was computed from. The inputs of the
+    stage are taken from `results` if available, then from the cached
+    artifacts, and are only recomputed if neither holds a valid copy.
+
+    Args:
+        stage (str): The name of the stage to run.
+        results (dict[str, Any]): Outputs of the stages that already ran in this session.
+                                  Updated in place with every stage that is (re)computed or loaded.
+        cache_dir (str): The directory holding the cached artifacts.
+        ttl_hours (float | None): Maximum age of cached inputs in hours. None disables the check.
+        artifact_ids (dict[str, str] | None): Artifact ids of the stages in `results`.
+                                              Updated in place like `results`.
+        db_path (str): The path to the SQLite database, used by the store stage.
+
+    Returns:
+        Any: The output of the stage.
+    """
+    if artifact_ids is None:
+        artifact_ids = dict()
+    function, inputs = STAGE_DEFINITIONS[stage]
+    args = [resolve_input(name, results, cache_dir, ttl_hours, artifact_ids, db_path) for name in inputs]
+    settings = {"db_path": db_path}
+    kwargs = {name: settings[name] for name in STAGE_SETTINGS.get(stage, [])}
+
+    print(f"Running stage '{stage}'")
+    results[stage] = function(*args, **kwargs)
+    artifact_ids[stage] = save_artifact(
+        stage, results[stage], cache_dir, inputs={name: artifact_ids[name] for name in inputs}
+    )
+    return results[stage]
+
+
+def resolve_input(
+    stage: str,
+    results: dict[str, Any],
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    ttl_hours: float | None = DEFAULT_TTL_HOURS,
+    artifact_ids: dict[str, str] | None = None,
+    db_path: str = DEFAULT_DB_PATH,
+) -> Any:
+    """
+    Returns the output of a stage, preferring this session's results, then a
+    valid cached artifact, and running the stage only as a last resort. A
+    cached artifact is only valid if it was computed from the current
+    artifacts of all its input stages, so rerunning a stage invalidates the
+    cached outputs of the stages after it.
+
+    Args:
+        stage (str): The name of the stage whose output is needed.
+        results (dict[str, Any]): Outputs of the stages that already ran in this session.
+        cache_dir (str): The directory holding the cached artifacts.
+        ttl_hours (float | None): Maximum age of cached inputs in hours. None disables the check.
+        artifact_ids (dict[str, str] | None): Artifact ids of the stages in `results`.
+        db_path (str): The path to the SQLite database, used by the store stage.
+
+    Returns:
+        Any: The output of the stage.
+    """
+    if artifact_ids is None:
+        artifact_ids = dict()
+    if stage in results:
+        return results[stage]
+
+    _, inputs = STAGE_DEFINITIONS[stage]
+    cached = load_artifact_record(stage, cache_dir, ttl_hours)
+    if cached is not None:
+        # Resolve the inputs first, this reruns them if their own cache is invalid
+        for name in inputs:
+            resolve_input(name, results, cache_dir, ttl_hours, artifact_ids, db_path)
+        if all(cached["inputs"].get(name) == artifact_ids[name] for name in inputs):
+            print(f"Using cached output of stage '{stage}'")
+            results[stage] = cached["data"]
+            artifact_ids[stage] = cached["id"]
+            return cached["data"]
+        print(f"Cached output of stage '{stage}' is outdated")
+
+    return run_stage(stage, results, cache_dir, ttl_hours, artifact_ids, db_path)
+
+
+def run_pipeline(
+    stages: list[str],
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    ttl_hours: float | None = DEFAULT_TTL_HOURS,
+    db_path: str = DEFAULT_DB_PATH,
+) -> dict[str, Any]:
+    """
+    Runs the requested stages in pipeline order. Stages that are not requested
+    but whose output is needed are loaded from the cache where possible.
+
+    Args:
+        stages (list[str]): The names of the stages to (re)run.
+        cache_dir (str): The directory holding the cached artifacts.
+        ttl_hours (float | None): Maximum age of cached inputs in hours. None disables the check.
+        db_path (str): The path to the SQLite database, used by the store stage.
+
+    Returns:
+        dict[str, Any]: The outputs of all stages that were run or loaded.
+    """
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    results = dict()
+    artifact_ids = dict()
+    stage_seconds = dict()
+    for stage in STAGES:
+        if stage in stages:
+            start = time.perf_counter()
+            run_stage(stage, results, cache_dir, ttl_hours, artifact_ids, db_path)
+            stage_seconds[stage] = round(time.perf_counter() - start, 3)
+
+    write_run_report({"stage_seconds": stage_seconds, "io": scheduler_reports()}, cache_dir)
+    return results
+
+
+def write_run_report(
+    report: dict[str, Any],
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    filename: str = "run_report.json",
+) -> str:
+    """
+    Prints the I/O statistics of a run and writes the full report to a JSON file
+    in the cache directory.
+
+    Args:
+        report (dict[str, Any]): The report, with the I/O scheduler reports under "io".
+        cache_dir (str): The directory holding the cached artifacts.
+        filename (str): The name of the report file.
+
+    Returns:
+        str: The path of the written report.
+    """
+    for name, io_report in report.get("io", {}).items():
+        if not io_report["operations"]:
+            continue
+        print(
+            f"I/O {name}: {io_report['operations']} operations, {io_report['errors']} errors, "
+            f"concurrency {io_report['concurrency_limit']} "
+            f"(range {io_report['concurrency_limit_min']}-{io_report['concurrency_limit_max']}), "
+            f"latency p50 {io_report['latency_p50_ms']:.1f} ms, p90 {io_report['latency_p90_ms']:.1f} ms, "
+            f"p99 {io_report['latency_p99_ms']:.1f} ms"
+        )
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, filename)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def project_numbers(
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    ttl_hours: float | None = DEFAULT_TTL_HOURS,
+) -> list[int]:
+    """
+    Returns the valid project numbers from the (cached) output of the fetch stage.
+
+    Args:
+        cache_dir (str): The directory holding the cached artifacts.
+        ttl_hours (float | None): Maximum age of the cached API data in hours. None disables the check.
+
+    Returns:
+        list[int]: The project numbers.
+    """
+    df_api = resolve_input("fetch", dict(), cache_dir, ttl_hours)
+    if "ProjectNumber" not in df_api.columns:
+        return []
+    return pd.to_numeric(df_api.ProjectNumber, errors="coerce").dropna().astype(int).tolist()
+
+
+def run_shard(
+    shard_index: int,
+    shard_count: int,
+    shard_dir: str = DEFAULT_SHARD_DIR,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> str:
+    """
+    Discovers, reads and scores the DMPs of one shard of the projects. The
+    project data is always taken from the cached fetch artifact, regardless of
+    its age, and is never fetched again: the id of the fetch artifact identifies
+    the run the shard belongs to, so all nodes must use the same artifact.
+    The run report of the shard is written to its own file in the cache
+    directory, so nodes running in parallel do not overwrite each other's report.
+
+    Args:
+        shard_index (int): The index of the shard, between 0 and shard_count - 1.
+        shard_count (int): The total number of shards.
+        shard_dir (str): The directory holding the shard files.
+        cache_dir (str): The directory holding the cached artifacts.
+
+    Returns:
+        str: The path of the written shard file.
+    """
+    fetch_artifact = load_artifact_record("fetch", cache_dir, ttl_hours=None)
+    if fetch_artifact is None:
+        raise FileNotFoundError(
+            f"No cached project data found in {cache_dir}, run the fetch stage with the same "
+            "--cache-dir before scoring the shards"
+        )
+    start = time.perf_counter()
+    path = score_shard(fetch_artifact["data"], fetch_artifact["id"], shard_index, shard_count, shard_dir)
+    report = {
+        "run_id": fetch_artifact["id"],
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "shard_seconds": round(time.perf_counter() - start, 3),
+        "io": scheduler_reports(),
+    }
+    write_run_report(report, cache_dir, f"run_report-shard-{shard_index:03d}-of-{shard_count:03d}.json")
+    return path
+
+
+def run_shard_merge(
+    shard_count: int,
+    shard_dir: str = DEFAULT_SHARD_DIR,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    ttl_hours: float | None = DEFAULT_TTL_HOURS,
+    allow_missing: bool = False,
+) -> list[int]:
+    """
+    Combines the shard files into the final table and runs the export stage.
+    Only shards scored from the cached project data count, shards of other
+    runs are missing. Nothing is exported if shards are missing, unless
+    `allow_missing` is set.
+
+    Args:
+        shard_count (int): The total number of shards of the run.
+        shard_dir (str): The directory holding the shard files.
+        cache_dir (str): The directory holding the cached artifacts.
+        ttl_hours (float | None): Maximum age of the cached inputs of the export stage in hours.
+                                  The project data of the shards is used regardless of its age.
+        allow_missing (bool): Export the results of the available shards if shards are missing.
+
+    Returns:
+        list[int]: The indices of the missing shards.
+    """
+    fetch_artifact = load_artifact_record("fetch", cache_dir, ttl_hours=None)
+    if fetch_artifact is None:
+        print("No cached project data found, the shards cannot be combined")
+        return list(range(shard_count))
+
+    dmps_table, missing = combine_shards(shard_dir, fetch_artifact["id"], shard_count)
+    if missing:
+        print(f"Missing {len(missing)} of {shard_count} shard(s): {', '.join(str(i) for i in missing)}")
+        if not allow_missing or len(missing) == shard_count:
+            return missing
+
+    results = {"fetch": fetch_artifact["data"]}
+    artifact_ids = {"fetch": fetch_artifact["id"]}
+    results["merge"] = merge_projects(results["fetch"], dmps_table)
+    artifact_ids["merge"] = save_artifact("merge", results["merge"], cache_dir, inputs=artifact_ids.copy())
+    run_stage("export", results, cache_dir, ttl_hours, artifact_ids)
+    return missing
@@ -1,4 +1,5 @@
 import datetime
+import io
 import os
 import re
 
@@ -8,11 +9,17 @@ from tqdm import tqdm
 from dmpt.dmp_v1 import read_and_score_dmp_v1
 from dmpt.dmp_v2 import read_and_score_dmp_v2
 
-from dmpt.tools.find_version_number import find_version_number
+from dmpt.tools.find_version_number import detect_version_number
+from dmpt.tools.io_scheduler import get_scheduler
 
 TQDM_DESCRIPTION_WIDTH = 30  # characters
 TQDM_PROGRESS_BAR_WIDTH = 100  # characters
 
+PROJECTS_ROOT = os.getenv("PROJECTS_ROOT", "n:\\Projects")
+DMP_FOLDER = "A. Contractual items"
+DMP_FILENAME_PATTERN = re.compile(r"\d+-[a-zA-Z]+_v\d+\.\d+-data-management-plan\.docx$")
+READ_BATCH_SIZE = 32  # number of DMPs that are read into memory at the same time
+
 
 def find_matching_docx(folder_path: str) -> str|None:
     """
@@ -25,19 +32,35 @@ def find_matching_docx(folder_path: str) -> str|None:
     Returns:
         str: Full path to the file if found, or None if no matching file exists.
     """
-    # Define the regex pattern
-    pattern = re.compile(r"\d+-[a-zA-Z]+_v\d+\.\d+-data-management-plan\.docx$")
-    
     # Walk through the directory
     for root, _, files in os.walk(folder_path):
         for file in files:
-            if file.endswith(".docx") and pattern.match(file):
+            if file.endswith(".docx") and DMP_FILENAME_PATTERN.match(file):
                 return os.path.join(root, file)
     
     return None
 
 
-def create_dmp_dictionary(df: pd.DataFrame) -> dict[int, str]:
+def round_down_to_500(number: int) -> int:
+    return number - (number % 500)
+
+
+def dmp_folder(project_number: int, projects_root: str = PROJECTS_ROOT) -> str:
+    """
+    Returns the folder on the project share where the DMP of a project is stored.
+    Projects are grouped in folders of 500 project numbers, e.g.
+    n:\\Projects\\11200500\\11200613\\A. Contractual items
+
+    Args:
+        project_number (int): The project number.
+        projects_root (str): The root folder of the project share.
+    Returns:
+        str: The path to the folder containing the DMP.
+    """
+    return os.path.join(projects_root, str(round_down_to_500(project_number)), str(project_number), DMP_FOLDER)
+
+
+def create_dmp_dictionary(df: pd.DataFrame, projects_root: str = PROJECTS_ROOT) -> dict[int, str]:
     """
     Creates a dictionary mapping project numbers to document paths.
     This function iterates over the project numbers in the given DataFrame,
@@ -47,27 +70,24 @@ def create_dmp_dictionary(df: pd.DataFrame) -> dict[int, str]:
 
     Args:
         df (pd.DataFrame): A DataFrame containing a column 'ProjectNumber' with project numbers.
+        projects_root (str): The root folder of the project share.
     Returns:
         dict[int, str]: A dictionary where the keys are project numbers and the values are paths to the matching .docx files.
     """
 
-    suffix = "A. Contractual items"
-    dmp = dict()
+    numbers = []
     for project_number in df.ProjectNumber:
-        def round_down_to_500(number: int) -> int:
-            return number - (number % 500)
-
         try:
-            number = int(project_number)
+            numbers.append(int(project_number))
         except ValueError:
             print(f"Invalid project number: {project_number}")
-            continue
 
-        # Define the source directory you want to copy
-        source_folder = f"n:\\Projects\\{round_down_to_500(number)}\\{number}\\{suffix}"
-        # Define the destination directory where you want the folder to be copied
+    # Search the project folders concurrently, the scheduler adapts the concurrency to the share
+    source_folders = [dmp_folder(number, projects_root) for number in numbers]
+    matches = get_scheduler("discovery").map(find_matching_docx, source_folders)
 
-        temp = find_matching_docx(source_folder)
+    dmp = dict()
+    for number, temp in zip(numbers, matches):
         if temp is not None:
             dmp[number] = temp
     return dmp
@@ -87,10 +107,12 @@ def date_modified(dmp: dict[int, str]) -> dict[int, pd.Timestamp]:
                                  and values are the last modified dates of 
                                  the corresponding files.
     """
-    dmp_date_modified = {}
     description = "Reading DMPs modification dates".ljust(TQDM_DESCRIPTION_WIDTH)
-    for project_number, file_path in tqdm(dmp.items(), description, ncols=TQDM_PROGRESS_BAR_WIDTH):
-        dmp_date_modified[project_number] = pd.to_datetime(datetime.datetime.fromtimestamp(os.path.getmtime(file_path)))
+    with tqdm(total=len(dmp), desc=description, ncols=TQDM_PROGRESS_BAR_WIDTH) as progress:
+        timestamps = get_scheduler("metadata").map(os.path.getmtime, dmp.values(), on_done=progress.update)
+    dmp_date_modified = {}
+    for project_number, timestamp in zip(dmp, timestamps):
+        dmp_date_modified[project_number] = pd.to_datetime(datetime.datetime.fromtimestamp(timestamp))
     return dmp_date_modified
 
 
@@ -109,10 +131,12 @@ def date_created(dmp: dict[int, str]) -> dict[int, pd.Timestamp]:
                                  and the values are the creation dates (pd.Timestamp) 
                                  of the corresponding files.
     """
-    dmp_date_created = {}
     description = "Reading DMPs creation dates".ljust(TQDM_DESCRIPTION_WIDTH)
-    for project_number, file_path in tqdm(dmp.items(), description, ncols=TQDM_PROGRESS_BAR_WIDTH):
-        dmp_date_created[project_number] = pd.to_datetime(datetime.datetime.fromtimestamp(os.path.getctime(file_path)))
+    with tqdm(total=len(dmp), desc=description, ncols=TQDM_PROGRESS_BAR_WIDTH) as progress:
+        timestamps = get_scheduler("metadata").map(os.path.getctime, dmp.values(), on_done=progress.update)
+    dmp_date_created = {}
+    for project_number, timestamp in zip(dmp, timestamps):
+        dmp_date_created[project_number] = pd.to_datetime(datetime.datetime.fromtimestamp(timestamp))
     return dmp_date_created
 
 
@@ -127,25 +151,96 @@ def read_and_score_dmps(dmp: dict[int, str]) -> dict[int, tuple[float, float, fl
     pd.DataFrame: A DataFrame containing the project numbers, total scores, individual scores, and the date modified for each DMP.
     """
     
+    items = list(dmp.items())
+
+    # The version detection only reads a small part of every file, run it concurrently.
+    # It has its own scheduler, its latency is much lower than that of reading a full file.
+    versions = get_scheduler("version").map(
+        detect_version_number, [file_path for _, file_path in items], return_exceptions=True
+    )
+
     dmp_scores = dict()
     description = "Reading and scoring DMPs".ljust(TQDM_DESCRIPTION_WIDTH)
-    for project_number, file_path in tqdm(dmp.items(), description, ncols=TQDM_PROGRESS_BAR_WIDTH):
-        major, minor = find_version_number(file_path)
-        try:
-            match major:
-                case(0):
-                    dmp_scores[project_number] = read_and_score_dmp_v1(file_path)
-                case(1):
-                    dmp_scores[project_number] = read_and_score_dmp_v1(file_path)
-                case(2):
-                    dmp_scores[project_number] = read_and_score_dmp_v2(file_path)
-        except Exception as e:  # noqa: F841
-            dmp_scores[project_number] = (-1, -1, -1)
+    with tqdm(total=len(items), desc=description, ncols=TQDM_PROGRESS_BAR_WIDTH) as progress:
+        for start in range(0, len(items), READ_BATCH_SIZE):
+            batch = list(zip(items[start:start + READ_BATCH_SIZE], versions[start:start + READ_BATCH_SIZE]))
+
+            # python-docx (v0 and v1) parses from memory, so these files are read concurrently.
+            # Word (v2) opens the file itself.
+            to_read = [
+                file_path for (_, file_path), version in batch
+                if not isinstance(version, Exception) and version[0] in (0, 1)
+            ]
+            contents = dict(
+                zip(to_read, get_scheduler("read").map(read_file, to_read, return_exceptions=True))
+            )
+
+            for (project_number, file_path), version in batch:
+                dmp_scores[project_number] = score_dmp(file_path, version, contents.get(file_path))
+                progress.update()
     return dmp_scores
 
-    
 
-def create_dmp_dataframe(df_api: pd.DataFrame) -> pd.DataFrame:
+def read_file(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def v1_scores_to_percentages(scores: tuple[float, float, float]) -> tuple[float, float, float]:
+    """
+    Converts the scores of a v0 or v1 DMP, which are fractions, to the 0 to 100 scale
+    of the v2 scores. Part 2 of a v1 DMP can score more than its target, it is capped at 100.
+
+    Args:
+        scores (tuple[float, float, float]): The scores as returned by read_and_score_dmp_v1.
+    Returns:
+        tuple[float, float, float]: The scores between 0 and 100.
+    """
+    return tuple(min(100.0, score * 100) for score in scores)
+
+
+def score_dmp(
+    file_path: str,
+    version: tuple[int, int] | Exception,
+    content: bytes | Exception | None = None,
+) -> tuple[float, float, float]:
+    """
+    Scores a single DMP with the reader of its template version.
+
+    Args:
+        file_path (str): The path to the DMP file.
+        version (tuple[int, int] | Exception): The major and minor template version, or the
+                                               error raised while detecting it.
+        content (bytes | Exception | None): The content of the file if it was already read, or the
+                                            error raised while reading it.
+    Returns:
+        tuple[float, float, float]: The scores between 0 and 100, or (-1, -1, -1) if the DMP could not be scored.
+    """
+    try:
+        if isinstance(version, Exception):
+            raise version
+        if isinstance(content, Exception):
+            raise content
+        major, minor = version
+        match major:
+            case(0):
+                return v1_scores_to_percentages(
+                    read_and_score_dmp_v1(io.BytesIO(content) if content is not None else file_path)
+                )
+            case(1):
+                return v1_scores_to_percentages(
+                    read_and_score_dmp_v1(io.BytesIO(content) if content is not None else file_path)
+                )
+            case(2):
+                return read_and_score_dmp_v2(file_path)
+            case _:
+                print(f"Unknown DMP template version v{major}.{minor}: {file_path}")
+                return (-1, -1, -1)
+    except Exception as e:  # noqa: F841
+        return (-1, -1, -1)
+
+    
+def create_dmp_dataframe(df_api: pd.DataFrame, projects_root: str = PROJECTS_ROOT) -> pd.DataFrame:
     """
     Creates a DataFrame containing DMP (Data Management Plan) scores and modification dates.
     This function processes the input DataFrame to generate a dictionary of DMPs, scores them,
@@ -153,6 +248,7 @@ def create_dmp_dataframe(df_api: pd.DataFrame) -> pd.DataFrame:
 
     Args:
         df_api (pd.DataFrame): The input DataFrame containing DMP data.
+        projects_root (str): The root folder of the project share.
     Returns:
         pd.DataFrame: A DataFrame with the following columns:
             - 'project_number': The project numbers.
@@ -163,25 +259,46 @@ def create_dmp_dataframe(df_api: pd.DataFrame) -> pd.DataFrame:
             - 'date_modified': The modification dates for each DMP.
     """
 
-    dmp = create_dmp_dictionary(df_api)
+    dmp = create_dmp_dictionary(df_api, projects_root)
     
     dmp_date_created = date_created(dmp)
     dmp_date_modified = date_modified(dmp)
 
     dmp_scores = read_and_score_dmps(dmp)
 
+    return build_dmp_dataframe(dmp, dmp_date_created, dmp_date_modified, dmp_scores)
+
 
+def build_dmp_dataframe(
+    dmp: dict[int, str],
+    dmp_date_created: dict[int, pd.Timestamp],
+    dmp_date_modified: dict[int, pd.Timestamp],
+    dmp_scores: dict[int, tuple[float, float, float]],
+) -> pd.DataFrame:
+    """
+    Combines the results of the discovery, file metadata and scoring steps into
+    a single DataFrame with one row per DMP.
+
+    Args:
+        dmp (dict[int, str]): A dictionary mapping project numbers to DMP file paths.
+        dmp_date_created (dict[int, pd.Timestamp]): The creation dates per project number.
+        dmp_date_modified (dict[int, pd.Timestamp]): The modification dates per project number.
+        dmp_scores (dict[int, tuple[float, float, float]]): The scores per project number.
+    Returns:
+        pd.DataFrame: A DataFrame with the same columns as `create_dmp_dataframe`.
+    """
     # put the results in a dataframe
     # Create the dataframe
+    # Look up every value by project number so a missing entry can never shift the columns
+    project_numbers = list(dmp.keys())
+    scores = [dmp_scores.get(project_number, (-1, -1, -1)) for project_number in project_numbers]
     data = {
-        'ProjectNumber': list(dmp.keys()),
-        'score1': [scores[0] for scores in dmp_scores.values()],
-        'score2': [scores[1] for scores in dmp_scores.values()],
-        'total_score': [scores[2] for scores in dmp_scores.values()],
-        'dmp_date_created': [dt for dt in dmp_date_created.values()],
-        'dmp_date_modified': [dt for dt in dmp_date_modified.values()]
+        'ProjectNumber': project_numbers,
+        'score1': [score[0] for score in scores],
+        'score2': [score[1] for score in scores],
+        'total_score': [score[2] for score in scores],
+        'dmp_date_created': [dmp_date_created.get(project_number) for project_number in project_numbers],
+        'dmp_date_modified': [dmp_date_modified.get(project_number) for project_number in project_numbers]
     }
 
     return pd.DataFrame(data)
-
-    
\ No newline at end of file
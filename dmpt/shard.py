@@ -0,0 +1,131 @@
+import glob
+import os
+
+import pandas as pd
+
+from dmpt.score_dmp_files import PROJECTS_ROOT, create_dmp_dataframe, round_down_to_500
+
+DEFAULT_SHARD_DIR = os.path.join(os.getenv("PATH_TO_DATA", "data"), "shards")
+
+
+def shard_of_bucket(bucket: int, shard_count: int) -> int:
+    """
+    Returns the shard a 500-bucket of projects belongs to. Consecutive buckets
+    go to consecutive shards, so recent (busy) buckets are spread over all shards.
+
+    Args:
+        bucket (int): The bucket, i.e. the project number rounded down to 500.
+        shard_count (int): The total number of shards.
+    Returns:
+        int: The shard index, between 0 and shard_count - 1.
+    """
+    return (bucket // 500) % shard_count
+
+
+def select_shard(df_api: pd.DataFrame, shard_index: int, shard_count: int) -> pd.DataFrame:
+    """
+    Selects the projects whose bucket belongs to the given shard. Projects
+    with an invalid project number are not part of any shard.
+
+    Args:
+        df_api (pd.DataFrame): A DataFrame containing a column 'ProjectNumber' with project numbers.
+        shard_index (int): The index of the shard, between 0 and shard_count - 1.
+        shard_count (int): The total number of shards.
+    Returns:
+        pd.DataFrame: The rows of `df_api` that belong to the shard.
+    """
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"Shard index {shard_index} is not in the range 0 to {shard_count - 1}")
+
+    numbers = pd.to_numeric(df_api.ProjectNumber, errors="coerce")
+    shards = numbers.map(
+        lambda number: shard_of_bucket(round_down_to_500(int(number)), shard_count),
+        na_action="ignore",
+    )
+    return df_api[shards == shard_index]
+
+
+def shard_path(shard_dir: str, run_id: str, shard_index: int, shard_count: int) -> str:
+    """
+    Returns the path of the file with the partial results of a shard. The run
+    id and the number of shards are part of the name, so results of other runs
+    or of runs with a different number of shards are never combined.
+
+    Args:
+        shard_dir (str): The directory holding the shard files.
+        run_id (str): The id of the run, i.e. of the fetch artifact the shards are scored from.
+        shard_index (int): The index of the shard.
+        shard_count (int): The total number of shards.
+    Returns:
+        str: Full path to the shard file.
+    """
+    return os.path.join(shard_dir, f"shard-{run_id}-{shard_index:03d}-of-{shard_count:03d}.pkl")
+
+
+def score_shard(
+    df_api: pd.DataFrame,
+    run_id: str,
+    shard_index: int,
+    shard_count: int,
+    shard_dir: str = DEFAULT_SHARD_DIR,
+    projects_root: str = PROJECTS_ROOT,
+) -> str:
+    """
+    Finds, reads and scores the DMPs of the projects in one shard and writes
+    the partial results to the shard file.
+
+    Args:
+        df_api (pd.DataFrame): The processed project data of all projects.
+        run_id (str): The id of the run, i.e. of the fetch artifact `df_api` was loaded from.
+        shard_index (int): The index of the shard, between 0 and shard_count - 1.
+        shard_count (int): The total number of shards.
+        shard_dir (str): The directory holding the shard files.
+        projects_root (str): The root folder of the project share.
+    Returns:
+        str: The path of the written shard file.
+    """
+    df_shard = select_shard(df_api, shard_index, shard_count)
+    print(f"Shard {shard_index + 1} of {shard_count}: {len(df_shard)} projects")
+
+    dmps_table = create_dmp_dataframe(df_shard, projects_root)
+
+    os.makedirs(shard_dir, exist_ok=True)
+    path = shard_path(shard_dir, run_id, shard_index, shard_count)
+    # Write to a temporary file first so a crashed node never leaves a partial shard behind
+    temp_path = f"{path}.tmp"
+    pd.to_pickle({"run_id": run_id, "data": dmps_table}, temp_path)
+    os.replace(temp_path, path)
+    return path
+
+
+def combine_shards(shard_dir: str, run_id: str, shard_count: int) -> tuple[pd.DataFrame, list[int]]:
+    """
+    Combines the partial results of all shards of a run. Shard files of other
+    runs, e.g. left behind by an earlier run, count as missing.
+
+    Args:
+        shard_dir (str): The directory holding the shard files.
+        run_id (str): The id of the run, i.e. of the fetch artifact the shards are scored from.
+        shard_count (int): The total number of shards of the run.
+    Returns:
+        tuple[pd.DataFrame, list[int]]: The combined DMP table and the indices of the missing shards.
+    """
+    tables = []
+    missing = []
+    for shard_index in range(shard_count):
+        path = shard_path(shard_dir, run_id, shard_index, shard_count)
+        shard = pd.read_pickle(path) if os.path.exists(path) else None
+        if shard is not None and shard["run_id"] == run_id:
+            tables.append(shard["data"])
+        else:
+            missing.append(shard_index)
+
+    other_runs = set(glob.glob(os.path.join(shard_dir, "shard-*-of-*.pkl"))) - {
+        shard_path(shard_dir, run_id, shard_index, shard_count) for shard_index in range(shard_count)
+    }
+    if other_runs:
+        print(f"Ignoring {len(other_runs)} shard file(s) of other runs or with a different number of shards")
+
+    if not tables:
+        return pd.DataFrame(), missing
+    return pd.concat(tables, ignore_index=True), missing
@@ -1,4 +1,20 @@
+import functools
+import os
 import re
+import zipfile
+
+
+# Number of bytes of word/document.xml that are searched for the template title
+DOCUMENT_XML_HEAD_BYTES = 64 * 1024
+# Number of non-empty paragraphs at the start of the document that form the title block
+TITLE_PARAGRAPHS = 5
+# Major versions of the DMP templates that can be scored
+KNOWN_TEMPLATE_MAJORS = (0, 1, 2)
+CONTENT_VERSION_PATTERN = re.compile(r"\b(?:v|version\s*)(?P<major>\d+)\.(?P<minor>\d+)", re.IGNORECASE)
+CUSTOM_PROPERTY_PATTERN = re.compile(
+    r'<property[^>]*name="(?P<name>[^"]*)"[^>]*>\s*<vt:\w+>(?P<value>[^<]*)</vt:\w+>',
+    re.IGNORECASE,
+)
 
 
 def find_version_number(filename: str) -> tuple[int, int]:
@@ -15,4 +31,87 @@ def find_version_number(filename: str) -> tuple[int, int]:
     match_obj = re.search(version_pattern, filename)
     if match_obj is None:
         raise ValueError(f"No version number found in filename: {filename}")
-    return int(match_obj['major']), int(match_obj['minor'])
\ No newline at end of file
+    return int(match_obj['major']), int(match_obj['minor'])
+
+
+def detect_version_number(file_path: str) -> tuple[int, int]:
+    """Detect the template version of a DMP from its content, falling back to the filename.
+    Only small parts of the .docx package are read: the custom document properties,
+    and the title block at the start of word/document.xml.
+    The result is cached per file path, size and modification time.
+
+    Args:
+        file_path (str): The path to the DMP file
+
+    Returns:
+        tuple[int, int]: Tuple of major and minor version numbers
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return find_version_number(os.path.basename(file_path))
+    return _detect_version_number(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4096)
+def _detect_version_number(file_path: str, size: int, mtime_ns: int) -> tuple[int, int]:
+    version = sniff_version_number(file_path)
+    if version is None:
+        return find_version_number(os.path.basename(file_path))
+    return version
+
+
+def sniff_version_number(file_path: str) -> tuple[int, int] | None:
+    """Find the template version in the content of a .docx file.
+    The version is taken from a custom document property with "version" in its
+    name, or else from the title block: the first TITLE_PARAGRAPHS non-empty
+    paragraphs, which includes the first tables. Versions mentioned further on
+    in the document (e.g. of a model) are ignored, as are versions whose major
+    is not one of KNOWN_TEMPLATE_MAJORS.
+
+    Args:
+        file_path (str): The path to the .docx file
+
+    Returns:
+        tuple[int, int] | None: Tuple of major and minor version numbers, or None if not found
+    """
+    try:
+        with zipfile.ZipFile(file_path) as package:
+            names = set(package.namelist())
+
+            if "docProps/custom.xml" in names:
+                custom = package.read("docProps/custom.xml").decode("utf-8", errors="ignore")
+                for match_obj in CUSTOM_PROPERTY_PATTERN.finditer(custom):
+                    if "version" in match_obj["name"].lower():
+                        version = _search_version(match_obj["value"], require_prefix=False)
+                        if version is not None:
+                            return version
+
+            if "word/document.xml" in names:
+                with package.open("word/document.xml") as document:
+                    head = document.read(DOCUMENT_XML_HEAD_BYTES).decode("utf-8", errors="ignore")
+                return _search_version(_title_text(head))
+    except (OSError, zipfile.BadZipFile):
+        return None
+    return None
+
+
+def _title_text(document_xml: str) -> str:
+    # Runs within a paragraph are joined, paragraphs (also those in table cells) are separated by a space
+    paragraphs = []
+    for paragraph in document_xml.split("</w:p>")[:-1]:
+        text = re.sub(r"<[^>]*>", "", paragraph).strip()
+        if text:
+            paragraphs.append(text)
+            if len(paragraphs) == TITLE_PARAGRAPHS:
+                break
+    return " ".join(paragraphs)
+
+
+def _search_version(text: str, require_prefix: bool = True) -> tuple[int, int] | None:
+    pattern = CONTENT_VERSION_PATTERN if require_prefix else re.compile(r"(?P<major>\d+)\.(?P<minor>\d+)")
+    for match_obj in pattern.finditer(text):
+        version = int(match_obj["major"]), int(match_obj["minor"])
+        if version[0] in KNOWN_TEMPLATE_MAJORS:
+            return version
+    return None
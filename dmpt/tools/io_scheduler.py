@@ -0,0 +1,204 @@
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+MIN_CONCURRENCY = int(os.getenv("IO_MIN_CONCURRENCY", "1"))
+MAX_CONCURRENCY = int(os.getenv("IO_MAX_CONCURRENCY", "32"))
+INITIAL_CONCURRENCY = int(os.getenv("IO_INITIAL_CONCURRENCY", "4"))
+WINDOW_SIZE = 20  # completed operations per adjustment of the limit
+LATENCY_TOLERANCE = 2.0  # decrease the limit when latency exceeds the baseline by this factor
+LATENCY_SAMPLES = 1000  # number of recent latencies used for the percentiles in the report
+
+
+class AdaptiveIOScheduler:
+    """
+    Runs I/O operations (e.g. on the network share) in a thread pool with a
+    concurrency limit that adapts to the measured latency (AIMD).
+
+    After every window of completed operations the median latency of the
+    window is compared with the baseline latency, the lowest window median
+    seen so far. If the window had errors, or its median exceeds the baseline
+    by more than LATENCY_TOLERANCE, the limit is halved. Otherwise the limit is
+    increased by one. The limit always stays between the configured bounds.
+    The baseline slowly drifts up so it recovers when the share stays slower.
+    """
+
+    def __init__(
+        self,
+        min_concurrency: int = MIN_CONCURRENCY,
+        max_concurrency: int = MAX_CONCURRENCY,
+        initial_concurrency: int = INITIAL_CONCURRENCY,
+        window_size: int = WINDOW_SIZE,
+        latency_tolerance: float = LATENCY_TOLERANCE,
+    ):
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError(f"Invalid concurrency bounds: {min_concurrency} to {max_concurrency}")
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.window_size = window_size
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = min(max(initial_concurrency, min_concurrency), max_concurrency)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._executor: ThreadPoolExecutor | None = None
+
+        self._window: list[float] = []
+        self._window_errors = 0
+        self._baseline: float | None = None
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._operations = 0
+        self._errors = 0
+        self._limit_range = (self._limit, self._limit)
+
+    @property
+    def limit(self) -> int:
+        """The current concurrency limit."""
+        return self._limit
+
+    def map(
+        self,
+        function: Callable[[Any], Any],
+        items: Iterable[Any],
+        on_done: Callable[[], Any] | None = None,
+        return_exceptions: bool = False,
+    ) -> list[Any]:
+        """
+        Calls the function for every item, with at most `limit` calls running at the same time.
+
+        Args:
+            function (Callable[[Any], Any]): The I/O operation to run for every item.
+            items (Iterable[Any]): The items.
+            on_done (Callable[[], Any] | None): Called after every completed operation, e.g. to update a progress bar.
+            return_exceptions (bool): Return the exception of a failed operation as its result
+                                      instead of raising it.
+        Returns:
+            list[Any]: The results, in the order of the items.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="io")
+
+        futures: list[Future] = []
+        for item in items:
+            with self._condition:
+                while self._in_flight >= self._limit:
+                    self._condition.wait()
+                self._in_flight += 1
+            futures.append(self._executor.submit(self._run, function, item, on_done))
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def _run(self, function: Callable[[Any], Any], item: Any, on_done: Callable[[], Any] | None) -> Any:
+        start = time.perf_counter()
+        failed = False
+        try:
+            return function(item)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._record(time.perf_counter() - start, failed)
+            if on_done is not None:
+                on_done()
+
+    def _record(self, latency: float, failed: bool) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            self._operations += 1
+            self._latencies.append(latency)
+            self._window.append(latency)
+            if failed:
+                self._errors += 1
+                self._window_errors += 1
+
+            if len(self._window) >= self.window_size:
+                self._adjust()
+            self._condition.notify_all()
+
+    def _adjust(self) -> None:
+        median = statistics.median(self._window)
+        if self._baseline is None:
+            self._baseline = median
+        else:
+            self._baseline = min(self._baseline * 1.05, median)
+
+        if self._window_errors or median > self._baseline * self.latency_tolerance:
+            self._limit = max(self.min_concurrency, self._limit // 2)
+        else:
+            self._limit = min(self.max_concurrency, self._limit + 1)
+        self._limit_range = (min(self._limit_range[0], self._limit), max(self._limit_range[1], self._limit))
+
+        self._window = []
+        self._window_errors = 0
+
+    def report(self) -> dict[str, float | int | None]:
+        """
+        Returns the current concurrency limit and statistics of the recent operations.
+
+        Returns:
+            dict[str, float | int | None]: The current, lowest and highest concurrency limit,
+                the number of operations and errors, and the 50th, 90th and 99th percentile
+                latency in milliseconds over the most recent operations.
+        """
+        with self._condition:
+            latencies = sorted(self._latencies)
+            report = {
+                "concurrency_limit": self._limit,
+                "concurrency_limit_min": self._limit_range[0],
+                "concurrency_limit_max": self._limit_range[1],
+                "operations": self._operations,
+                "errors": self._errors,
+            }
+        for percentile in (50, 90, 99):
+            if latencies:
+                index = min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+                report[f"latency_p{percentile}_ms"] = latencies[index] * 1000
+            else:
+                report[f"latency_p{percentile}_ms"] = None
+        return report
+
+    def shutdown(self) -> None:
+        """Stops the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_schedulers: dict[str, AdaptiveIOScheduler] = dict()
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(name: str) -> AdaptiveIOScheduler:
+    """
+    Returns the shared scheduler for a kind of I/O operation, e.g. "discovery".
+    Every kind has its own scheduler, so the latencies of cheap and expensive
+    operations are not mixed.
+
+    Args:
+        name (str): The kind of I/O operation.
+    Returns:
+        AdaptiveIOScheduler: The scheduler.
+    """
+    with _schedulers_lock:
+        if name not in _schedulers:
+            _schedulers[name] = AdaptiveIOScheduler()
+        return _schedulers[name]
+
+
+def scheduler_reports() -> dict[str, dict[str, float | int | None]]:
+    """Returns the report of every shared scheduler that was used."""
+    with _schedulers_lock:
+        schedulers = dict(_schedulers)
+    return {name: scheduler.report() for name, scheduler in schedulers.items()}
@@ -0,0 +1,226 @@
+import os
+import time
+from collections import defaultdict
+from typing import Callable, Iterable
+
+import pandas as pd
+
+from dmpt.database import DEFAULT_DB_PATH, init_db, read_dmp_file_state, upsert_dmp_scores
+from dmpt.score_dmp_files import (
+    DMP_FILENAME_PATTERN,
+    DMP_FOLDER,
+    PROJECTS_ROOT,
+    find_matching_docx,
+    read_and_score_dmps,
+    round_down_to_500,
+)
+
+
+class DmpWatcher:
+    """
+    Keeps track of the DMP folders of a set of projects and reports the DMPs
+    that are new or modified since the previous poll.
+
+    Every poll lists each 500-bucket folder once to see which project folders
+    exist. Of every existing project one folder is checked: the folder holding
+    the known DMP, which can be a subfolder of the DMP folder, or else the DMP
+    folder itself. It is only listed again when its modification time changed,
+    which happens when a file in it is created, removed or saved by Word (Word
+    saves by replacing the file). Reading and scoring therefore only happens for
+    the folders that changed.
+    """
+
+    def __init__(
+        self,
+        projects_root: str = PROJECTS_ROOT,
+        known_dmps: dict[int, tuple[str, float]] | None = None,
+    ):
+        """
+        Args:
+            projects_root (str): The root folder of the project share.
+            known_dmps (dict[int, tuple[str, float]] | None): Project number -> (path, modification time)
+                of DMPs that are already scored, e.g. from `read_dmp_file_state`. These are not
+                reported as changed on the first poll if the file is unchanged.
+        """
+        self.projects_root = projects_root
+        self._folder_mtimes: dict[int, tuple[str, float]] = dict()
+        self._dmp_files: dict[int, tuple[str, float]] = dict(known_dmps or {})
+
+    def poll(self, project_numbers: Iterable[int]) -> dict[int, str]:
+        """
+        Checks the DMP folders of the given projects for new or modified DMPs.
+
+        Args:
+            project_numbers (Iterable[int]): The project numbers to check.
+        Returns:
+            dict[int, str]: Project number -> DMP path of every new or modified DMP.
+        """
+        buckets = defaultdict(set)
+        for project_number in project_numbers:
+            buckets[round_down_to_500(project_number)].add(project_number)
+
+        changed = dict()
+        for bucket, numbers in buckets.items():
+            bucket_folder = os.path.join(self.projects_root, str(bucket))
+            for project_number in self._existing_project_folders(bucket_folder, numbers):
+                folder = os.path.join(bucket_folder, str(project_number), DMP_FOLDER)
+                dmp = self._check_folder(project_number, folder)
+                if dmp is not None:
+                    changed[project_number] = dmp
+        return changed
+
+    def _existing_project_folders(self, bucket_folder: str, numbers: set[int]) -> list[int]:
+        try:
+            with os.scandir(bucket_folder) as entries:
+                names = {entry.name for entry in entries if entry.is_dir()}
+        except OSError:
+            return []
+        return [number for number in numbers if str(number) in names]
+
+    def _check_folder(self, project_number: int, folder: str) -> str | None:
+        known = self._dmp_files.get(project_number)
+        watched = os.path.dirname(known[0]) if known is not None else folder
+        try:
+            folder_mtime = os.stat(watched).st_mtime
+        except OSError:
+            # The folder of the known DMP was removed or renamed, check the DMP folder instead
+            if watched == folder:
+                return None
+            watched = folder
+            try:
+                folder_mtime = os.stat(watched).st_mtime
+            except OSError:
+                return None
+        if self._folder_mtimes.get(project_number) == (watched, folder_mtime):
+            return None
+        self._folder_mtimes[project_number] = (watched, folder_mtime)
+
+        dmp = find_dmp(folder)
+        if dmp is None or self._dmp_files.get(project_number) == dmp:
+            return None
+        self._dmp_files[project_number] = dmp
+        return dmp[0]
+
+    def forget(self, project_numbers: Iterable[int]) -> None:
+        """
+        Forgets the state of the given projects, so their DMPs are reported again
+        on the next poll, e.g. to retry DMPs that could not be read.
+
+        Args:
+            project_numbers (Iterable[int]): The project numbers to forget.
+        """
+        for project_number in project_numbers:
+            self._folder_mtimes.pop(project_number, None)
+            self._dmp_files.pop(project_number, None)
+
+
+def find_dmp(folder_path: str) -> tuple[str, float] | None:
+    """
+    Finds the DMP in a folder together with its modification time. The folder
+    itself is listed first, subfolders are only searched if it holds no DMP.
+
+    Args:
+        folder_path (str): The path to the folder to search in.
+    Returns:
+        tuple[str, float] | None: The path and modification time of the DMP, or None if not found.
+    """
+    try:
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if entry.is_file() and DMP_FILENAME_PATTERN.match(entry.name):
+                    return entry.path, entry.stat().st_mtime
+    except OSError:
+        return None
+
+    path = find_matching_docx(folder_path)
+    if path is None:
+        return None
+    return path, os.path.getmtime(path)
+
+
+def rescore_dmps(dmp: dict[int, str], db_path: str = DEFAULT_DB_PATH) -> list[int]:
+    """
+    Scores the given DMPs and upserts the results into the database. DMPs that
+    could not be read or scored are not stored, so the previous score is kept.
+
+    Args:
+        dmp (dict[int, str]): Project number -> DMP path of the DMPs to score.
+        db_path (str): The path to the SQLite database.
+    Returns:
+        list[int]: The project numbers of the DMPs that could not be read or scored.
+    """
+    dmp_scores = read_and_score_dmps(dmp)
+
+    rows = []
+    failed = []
+    for project_number, file_path in dmp.items():
+        try:
+            file_stat = os.stat(file_path)
+        except OSError as e:
+            print(f"Skipping project {project_number}, DMP is no longer readable: {e}")
+            failed.append(project_number)
+            continue
+        score1, score2, total_score = dmp_scores[project_number]
+        if (score1, score2, total_score) == (-1, -1, -1):
+            print(f"Skipping project {project_number}, DMP could not be scored: {file_path}")
+            failed.append(project_number)
+            continue
+        rows.append({
+            "project_number": project_number,
+            "dmp_path": file_path,
+            "dmp_mtime": file_stat.st_mtime,
+            "score1": score1,
+            "score2": score2,
+            "total_score": total_score,
+            "dmp_date_created": pd.Timestamp.fromtimestamp(file_stat.st_ctime),
+            "dmp_date_modified": pd.Timestamp.fromtimestamp(file_stat.st_mtime),
+        })
+    upsert_dmp_scores(rows, db_path)
+    return failed
+
+
+def watch(
+    get_project_numbers: Callable[[], Iterable[int]],
+    db_path: str = DEFAULT_DB_PATH,
+    interval_seconds: float = 300,
+    projects_root: str = PROJECTS_ROOT,
+    max_polls: int | None = None,
+) -> None:
+    """
+    Polls the project share and rescores DMPs as soon as they are created or
+    modified. DMPs that are already in the database with the same modification
+    time are not rescored after a restart. DMPs that could not be read or
+    scored are retried on the next poll.
+
+    Args:
+        get_project_numbers (Callable[[], Iterable[int]]): Returns the project numbers to watch.
+                                                           Called before every poll. If it fails,
+                                                           the numbers of the previous poll are used.
+        db_path (str): The path to the SQLite database.
+        interval_seconds (float): Time between the start of two polls.
+        projects_root (str): The root folder of the project share.
+        max_polls (int | None): Stop after this many polls. None keeps polling forever.
+    """
+    init_db(db_path)
+    watcher = DmpWatcher(projects_root, known_dmps=read_dmp_file_state(db_path))
+
+    project_numbers = None
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        start = time.monotonic()
+
+        try:
+            project_numbers = list(get_project_numbers())
+        except Exception as e:
+            if project_numbers is None:
+                raise
+            print(f"Could not update the project numbers, watching the previous {len(project_numbers)}: {e}")
+
+        changed = watcher.poll(project_numbers)
+        if changed:
+            print(f"Rescoring {len(changed)} new or modified DMP(s)")
+            watcher.forget(rescore_dmps(changed, db_path))
+
+        polls += 1
+        if max_polls is None or polls < max_polls:
+            time.sleep(max(0.0, interval_seconds - (time.monotonic() - start)))
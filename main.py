@@ -1,38 +1,128 @@
-import os
-from dotenv import load_dotenv
+import argparse
+import sys
 
-from dmpt.get_fnc_data import call_dmp_api, process_api_data
-from dmpt.score_dmp_files import create_dmp_dataframe
+from dotenv import load_dotenv
 
 load_dotenv()
 
-def main():
+from dmpt.cache import DEFAULT_CACHE_DIR, DEFAULT_TTL_HOURS  # noqa: E402
+from dmpt.database import DEFAULT_DB_PATH  # noqa: E402
+from dmpt.pipeline import STAGES, project_numbers, run_pipeline, run_shard, run_shard_merge  # noqa: E402
+from dmpt.shard import DEFAULT_SHARD_DIR  # noqa: E402
+from dmpt.watch import watch  # noqa: E402
 
-    # Get data from API
-    projects = call_dmp_api()
 
-    # Process the data
-    df = process_api_data(projects)
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Score the Data Management Plans of all projects. Every stage stores its "
+        "output in the cache directory, so a stage can be rerun from the cached output of the "
+        "stages before it."
+    )
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        choices=STAGES + ["all"],
+        help="The stage(s) to run: fetch (API), discover (find DMPs on the share), stat (file "
+        "dates), score (read and score DMPs), merge (combine with project data), export "
+        "(write the output file) and store (update the database and its rollups). Default: all.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for the cached stage outputs. Default: {DEFAULT_CACHE_DIR}",
+    )
+    parser.add_argument(
+        "--ttl",
+        type=float,
+        default=DEFAULT_TTL_HOURS,
+        help=f"Maximum age in hours of cached stage outputs. Default: {DEFAULT_TTL_HOURS}",
+    )
+    parser.add_argument(
+        "--no-ttl",
+        action="store_true",
+        help="Use cached stage outputs regardless of their age.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rescore DMPs as soon as they are created or modified on the "
+        "project share. Scores are upserted into the database given by --db-path.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=300,
+        help="Seconds between two polls of the project share in watch mode. Default: 300",
+    )
+    parser.add_argument(
+        "--db-path",
+        default=DEFAULT_DB_PATH,
+        help=f"SQLite database used by the store stage and in watch mode. Default: {DEFAULT_DB_PATH}",
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        help="Split the projects in this number of shards by 500-bucket. Use together with "
+        "--shard-index to score one shard, or with --merge-shards to combine the shards.",
+    )
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        help="Score only the projects of this shard (0 to shard count - 1) and write the results "
+        "to the shard directory.",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        action="store_true",
+        help="Combine the results of all shards and export the final table.",
+    )
+    parser.add_argument(
+        "--allow-missing-shards",
+        action="store_true",
+        help="Export the combined results even if some shards are missing.",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        default=DEFAULT_SHARD_DIR,
+        help=f"Directory for the shard files. Default: {DEFAULT_SHARD_DIR}",
+    )
+    args = parser.parse_args(argv)
+    if (args.shard_index is not None or args.merge_shards) and args.shard_count is None:
+        parser.error("--shard-index and --merge-shards require --shard-count")
+    return args
 
-    # Read and Scorethe DMPs
-    dmps_table = create_dmp_dataframe(df)
 
-    # make sure project numbers are integer type
-    df.ProjectNumber = df.ProjectNumber.astype(int)
-    dmps_table.ProjectNumber = dmps_table.ProjectNumber.astype(int)
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
 
-    # Combine scoring results with project data on project number
-    df_total = df.merge(
-        dmps_table,
-        left_on="ProjectNumber",
-        right_on="ProjectNumber",
-        how="outer",
-        indicator=True,
-    )
+    stages = STAGES if not args.stages or "all" in args.stages else args.stages
+    ttl_hours = None if args.no_ttl else args.ttl
+
+    if args.watch:
+        watch(
+            lambda: project_numbers(args.cache_dir, ttl_hours),
+            db_path=args.db_path,
+            interval_seconds=args.interval,
+        )
+        return
+
+    if args.shard_index is not None:
+        run_shard(args.shard_index, args.shard_count, args.shard_dir, args.cache_dir)
+        return
+
+    if args.merge_shards:
+        missing = run_shard_merge(
+            args.shard_count,
+            args.shard_dir,
+            args.cache_dir,
+            ttl_hours,
+            allow_missing=args.allow_missing_shards,
+        )
+        if missing and not args.allow_missing_shards:
+            sys.exit(1)
+        return
 
-    output_folder = os.getenv("PATH_TO_DATA", "data")
-    output_filename = os.getenv("OUTPUT_FILENAME", "output.csv")
-    df_total.to_csv(os.path.join(output_folder, output_filename), index=False, mode="w")
+    run_pipeline(stages, cache_dir=args.cache_dir, ttl_hours=ttl_hours, db_path=args.db_path)
 
 
 if __name__ == "__main__":
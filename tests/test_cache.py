@@ -0,0 +1,81 @@
+import datetime
+import pickle
+
+from dmpt import pipeline
+from dmpt.cache import ARTIFACT_VERSION, artifact_path, load_artifact, load_artifact_record, save_artifact
+
+
+def test_save_and_load_artifact(tmp_path) -> None:
+    data = {123456: "path/to/dmp.docx"}
+    save_artifact("discover", data, str(tmp_path))
+    assert load_artifact("discover", str(tmp_path)) == data
+
+
+def test_artifact_records_inputs(tmp_path) -> None:
+    fetch_id = save_artifact("fetch", [1, 2, 3], str(tmp_path))
+    discover_id = save_artifact("discover", {1: "dmp.docx"}, str(tmp_path), inputs={"fetch": fetch_id})
+    record = load_artifact_record("discover", str(tmp_path))
+    assert record["id"] == discover_id != fetch_id
+    assert record["inputs"] == {"fetch": fetch_id}
+
+
+def test_load_missing_artifact(tmp_path) -> None:
+    assert load_artifact("score", str(tmp_path)) is None
+
+
+def test_load_expired_artifact(tmp_path) -> None:
+    path = artifact_path("fetch", str(tmp_path))
+    with open(path, "wb") as f:
+        pickle.dump({
+            "version": ARTIFACT_VERSION,
+            "stage": "fetch",
+            "created": datetime.datetime.now() - datetime.timedelta(hours=2),
+            "data": [1, 2, 3],
+        }, f)
+    assert load_artifact("fetch", str(tmp_path), ttl_hours=1) is None
+    assert load_artifact("fetch", str(tmp_path), ttl_hours=3) == [1, 2, 3]
+    assert load_artifact("fetch", str(tmp_path), ttl_hours=None) == [1, 2, 3]
+
+
+def test_load_artifact_of_other_version(tmp_path) -> None:
+    path = artifact_path("fetch", str(tmp_path))
+    with open(path, "wb") as f:
+        pickle.dump({
+            "version": ARTIFACT_VERSION + 1,
+            "stage": "fetch",
+            "created": datetime.datetime.now(),
+            "data": [1, 2, 3],
+        }, f)
+    assert load_artifact("fetch", str(tmp_path)) is None
+
+
+def test_rerun_stage_invalidates_downstream_artifacts(tmp_path, monkeypatch) -> None:
+    calls = []
+
+    def stage(name, value):
+        def function(*args):
+            calls.append(name)
+            return (value, *args)
+        return function
+
+    monkeypatch.setattr(pipeline, "STAGE_DEFINITIONS", {
+        "fetch": (stage("fetch", 1), []),
+        "discover": (stage("discover", 2), ["fetch"]),
+        "stat": (stage("stat", 3), ["discover"]),
+        "score": (stage("score", 4), ["discover"]),
+        "merge": (stage("merge", 5), ["fetch", "discover", "stat", "score"]),
+        "export": (stage("export", 6), ["merge"]),
+        "store": (stage("store", 7), ["merge"]),
+    })
+    cache_dir = str(tmp_path)
+    pipeline.run_pipeline(["merge"], cache_dir)
+    assert calls == ["fetch", "discover", "stat", "score", "merge"]
+
+    calls.clear()
+    pipeline.run_pipeline(["merge"], cache_dir)
+    assert calls == ["merge"]
+
+    # stat and score were computed from the previous discover artifact
+    calls.clear()
+    pipeline.run_pipeline(["discover", "merge"], cache_dir)
+    assert calls == ["discover", "stat", "score", "merge"]
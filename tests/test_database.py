@@ -0,0 +1,110 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dmpt.pipeline
+from benchmarks.inputs import write_dmp_v1_docx
+from dmpt.database import get_rollup, init_db, upsert_dmp_scores, upsert_project_status
+from dmpt.score_dmp_files import read_and_score_dmps
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    db_path = str(tmp_path / "dmp_data.db")
+    init_db(db_path)
+    return db_path
+
+
+@pytest.fixture
+def df_total() -> pd.DataFrame:
+    return pd.DataFrame({
+        "ProjectNumber": [1, 2, 3, 4, 5],
+        "ResponsibleDepartment": ["BGS", "BGS", "BGS", "GEO", "BGS"],
+        "BusinessArea": ["A", "A", "B", "B", "A"],
+        "ProjectType": ["T", "T", "T", "T", "T"],
+        "Quote_Status": ["Order", "Order", "Quote", "Order", "Order"],
+        "total_score": [20.0, 60.0, 100.0, np.nan, -1],
+    })
+
+
+def expected_rollup(df: pd.DataFrame) -> dict:
+    scores = df.total_score[df.total_score >= 0]
+    return {
+        "projects": len(df),
+        "with_dmp": int(df.total_score.notna().sum()),
+        "without_dmp": int(df.total_score.isna().sum()),
+        "scored": len(scores),
+        "mean_score": scores.mean() if len(scores) else None,
+        **{
+            f"p{p}": int(np.percentile(scores, p, method="inverted_cdf")) if len(scores) else None
+            for p in (25, 50, 75, 90)
+        },
+    }
+
+
+def test_rollup(db_path: str, df_total: pd.DataFrame) -> None:
+    upsert_project_status(df_total, db_path)
+    bgs = df_total[df_total.ResponsibleDepartment == "BGS"]
+    assert get_rollup("responsible_department", "BGS", db_path) == expected_rollup(bgs)
+    assert get_rollup("responsible_department", "GEO", db_path) == {
+        "projects": 1, "with_dmp": 0, "without_dmp": 1, "scored": 0,
+        "mean_score": None, "p25": None, "p50": None, "p75": None, "p90": None,
+    }
+
+
+def test_rollup_is_updated_incrementally(db_path: str, df_total: pd.DataFrame) -> None:
+    upsert_project_status(df_total, db_path)
+
+    # Project 2 moves to another business area, project 4 gets a DMP
+    changed = df_total.copy()
+    changed.loc[1, "BusinessArea"] = "B"
+    changed.loc[3, "total_score"] = 80.0
+    upsert_project_status(changed.iloc[[1, 3]], db_path)
+    upsert_dmp_scores([{"project_number": 1, "total_score": 40.0}], db_path)
+    changed.loc[0, "total_score"] = 40.0
+
+    for area in ("A", "B"):
+        expected = expected_rollup(changed[changed.BusinessArea == area])
+        assert get_rollup("business_area", area, db_path) == expected
+
+    # The rollups equal the rollups computed from scratch
+    conn = sqlite3.connect(db_path)
+    rollups = conn.execute("SELECT * FROM dmp_rollups ORDER BY dimension, value").fetchall()
+    conn.close()
+    init_db(str(db_path) + ".fresh")
+    upsert_project_status(changed, str(db_path) + ".fresh")
+    conn = sqlite3.connect(str(db_path) + ".fresh")
+    assert conn.execute("SELECT * FROM dmp_rollups ORDER BY dimension, value").fetchall() == rollups
+    conn.close()
+
+
+def test_rollup_unknown_dimension(db_path: str) -> None:
+    with pytest.raises(ValueError):
+        get_rollup("financier", "X", db_path)
+
+
+def test_rollup_of_v1_score_is_on_percentage_scale(db_path: str, df_total: pd.DataFrame, tmp_path) -> None:
+    path = write_dmp_v1_docx(str(tmp_path / "1-BGS_v1.1-data-management-plan.docx"))
+    scores = read_and_score_dmps({1: path})
+    # Part 2 of the v1 DMP scores 8 of 6 points
+    assert scores[1] == pytest.approx((60.0, 100.0, 87.5))
+
+    df = df_total.iloc[:1].assign(total_score=scores[1][2])
+    upsert_project_status(df, db_path)
+    rollup = get_rollup("responsible_department", "BGS", db_path)
+    assert rollup["mean_score"] == pytest.approx(87.5)
+    assert rollup["p50"] == 87
+
+
+def test_store_stage_and_watch_mode_share_database(df_total: pd.DataFrame, tmp_path, monkeypatch) -> None:
+    monkeypatch.setitem(dmpt.pipeline.STAGE_DEFINITIONS, "merge", (lambda: df_total, []))
+    db_path = str(tmp_path / "other.db")
+    dmpt.pipeline.run_pipeline(["store"], str(tmp_path / "cache"), db_path=db_path)
+    assert get_rollup("responsible_department", "GEO", db_path)["with_dmp"] == 0
+
+    # Watch mode upserts into the same database, which updates the rollups
+    upsert_dmp_scores([{"project_number": 4, "dmp_path": "dmp.docx", "dmp_mtime": 1.0,
+                        "score1": 80.0, "score2": 80.0, "total_score": 80.0}], db_path)
+    assert get_rollup("responsible_department", "GEO", db_path)["with_dmp"] == 1
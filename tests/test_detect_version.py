@@ -0,0 +1,104 @@
+import os
+import zipfile
+
+import pytest
+
+from dmpt.tools.find_version_number import detect_version_number, sniff_version_number
+
+CUSTOM_XML = (
+    '<Properties xmlns:vt="http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes">'
+    '<property fmtid="{D5CDD505-2E9C-101B-9397-08002B2CF9AE}" pid="2" name="TemplateVersion">'
+    '<vt:lpwstr>VERSION</vt:lpwstr></property></Properties>'
+)
+DOCUMENT_XML = (
+    '<w:document><w:body>'
+    '<w:p><w:r><w:t>Data Management Plan </w:t></w:r><w:r><w:t>{version}</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Version 9.9 of our model</w:t></w:r></w:p>'
+    '</w:body></w:document>'
+)
+
+
+def create_docx(path: str, parts: dict[str, str]) -> str:
+    with zipfile.ZipFile(path, "w") as package:
+        for name, content in parts.items():
+            package.writestr(name, content)
+    return path
+
+
+def test_sniff_version_from_custom_properties(tmp_path) -> None:
+    path = create_docx(str(tmp_path / "dmp.docx"), {
+        "docProps/custom.xml": CUSTOM_XML.replace("VERSION", "2.4"),
+        "word/document.xml": DOCUMENT_XML.format(version="v1.1"),
+    })
+    assert sniff_version_number(path) == (2, 4)
+
+
+def test_sniff_version_from_document(tmp_path) -> None:
+    path = create_docx(str(tmp_path / "dmp.docx"), {
+        "word/document.xml": DOCUMENT_XML.format(version="v2.1"),
+    })
+    assert sniff_version_number(path) == (2, 1)
+
+
+def test_sniff_version_from_v1_title_table(tmp_path) -> None:
+    path = create_docx(str(tmp_path / "dmp.docx"), {
+        "word/document.xml": (
+            "<w:document><w:body>"
+            "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Data Management Plan</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+            "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Version</w:t></w:r></w:p></w:tc>"
+            "<w:tc><w:p><w:r><w:t>1.1</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+            "</w:body></w:document>"
+        ),
+    })
+    assert sniff_version_number(path) == (1, 1)
+
+
+def test_detect_version_ignores_versions_in_body(tmp_path) -> None:
+    body = "".join(f"<w:p><w:r><w:t>Paragraph {i}</w:t></w:r></w:p>" for i in range(10))
+    path = create_docx(str(tmp_path / "123456789-BGS_v1.1-data-management-plan.docx"), {
+        "docProps/core.xml": "<cp:coreProperties><dc:title>Results of model v2.5</dc:title></cp:coreProperties>",
+        "word/document.xml": (
+            "<w:document><w:body><w:p><w:r><w:t>Data Management Plan</w:t></w:r></w:p>"
+            f"{body}<w:p><w:r><w:t>We use model v2.5 and version 1.3 of the data.</w:t></w:r></w:p>"
+            "</w:body></w:document>"
+        ),
+    })
+    assert sniff_version_number(path) is None
+    assert detect_version_number(path) == (1, 1)
+
+
+def test_detect_version_ignores_unknown_template_versions(tmp_path) -> None:
+    path = create_docx(str(tmp_path / "123456789-BGS_v1.1-data-management-plan.docx"), {
+        "docProps/custom.xml": CUSTOM_XML.replace("VERSION", "4.5"),
+        "word/document.xml": DOCUMENT_XML.format(version="for model v4.5"),
+    })
+    assert detect_version_number(path) == (1, 1)
+
+
+def test_detect_version_of_renamed_file(tmp_path) -> None:
+    path = create_docx(str(tmp_path / "123456789-BGS_v1.1-data-management-plan.docx"), {
+        "word/document.xml": DOCUMENT_XML.format(version="v2.1"),
+    })
+    assert detect_version_number(path) == (2, 1)
+
+
+@pytest.mark.parametrize("content", [None, b"not a zip file"])
+def test_detect_version_falls_back_to_filename(tmp_path, content: bytes | None) -> None:
+    path = str(tmp_path / "123456789-BGS_v1.3-data-management-plan.docx")
+    if content is None:
+        create_docx(path, {"word/document.xml": "<w:document></w:document>"})
+    else:
+        with open(path, "wb") as f:
+            f.write(content)
+    assert detect_version_number(path) == (1, 3)
+
+
+def test_detect_version_is_cached_per_file_identity(tmp_path) -> None:
+    path = create_docx(str(tmp_path / "dmp.docx"), {
+        "word/document.xml": DOCUMENT_XML.format(version="v2.1"),
+    })
+    assert detect_version_number(path) == (2, 1)
+
+    create_docx(path, {"word/document.xml": DOCUMENT_XML.format(version="v2.10")})
+    os.utime(path, ns=(0, 10**18))
+    assert detect_version_number(path) == (2, 10)
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from dmpt.export import OutputWriter, merge_projects, write_output
+
+
+@pytest.fixture
+def df_api() -> pd.DataFrame:
+    return pd.DataFrame({
+        "ProjectNumber": ["11200500", "11200501"],
+        "ResponsibleDepartment": ["BGS", "GEO"],
+        "DateModified": pd.to_datetime(["2024-01-01", "2024-02-01"]),
+    })
+
+
+@pytest.fixture
+def dmps_table() -> pd.DataFrame:
+    return pd.DataFrame({
+        "ProjectNumber": [11200501, 11200999],
+        "total_score": [50.0, 75.0],
+    })
+
+
+def test_merge_projects(df_api: pd.DataFrame, dmps_table: pd.DataFrame) -> None:
+    df_total = merge_projects(df_api, dmps_table)
+    expected = df_api.assign(ProjectNumber=df_api.ProjectNumber.astype(int)).merge(
+        dmps_table, on="ProjectNumber", how="outer", indicator=True
+    )
+    pd.testing.assert_frame_equal(
+        df_total.reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=False,
+        check_categorical=False,
+    )
+    assert list(df_total["_merge"]) == ["left_only", "both", "right_only"]
+
+
+def test_write_output_parquet_preserves_dtypes(tmp_path, df_api: pd.DataFrame, dmps_table: pd.DataFrame) -> None:
+    pytest.importorskip("pyarrow")
+    df_total = merge_projects(df_api, dmps_table)
+    path = write_output(df_total, str(tmp_path / "output.parquet"))
+
+    df_read = pd.read_parquet(path)
+    assert isinstance(df_read.ResponsibleDepartment.dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df_read.DateModified)
+    assert len(df_read) == 3
+
+
+def test_output_writer_row_groups(tmp_path, df_api: pd.DataFrame) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "output.parquet")
+    with OutputWriter(path) as writer:
+        writer.write(df_api.iloc[:1])
+        writer.write(df_api.iloc[1:])
+
+    assert pq.ParquetFile(path).num_row_groups == 2
+    assert list(pd.read_parquet(path).ProjectNumber) == ["11200500", "11200501"]
+
+
+def test_output_writer_compressed_csv(tmp_path, df_api: pd.DataFrame) -> None:
+    path = str(tmp_path / "output.csv.gz")
+    with OutputWriter(path) as writer:
+        writer.write(df_api.iloc[:1])
+        writer.write(df_api.iloc[1:])
+
+    df_read = pd.read_csv(path)
+    assert list(df_read.ProjectNumber) == [11200500, 11200501]
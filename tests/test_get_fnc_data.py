@@ -0,0 +1,140 @@
+import os
+
+import pandas as pd
+import pytest
+import requests
+
+os.environ.setdefault("API_URL", "https://localhost/api")
+
+import dmpt.get_fnc_data  # noqa: E402
+from dmpt import pipeline  # noqa: E402
+from dmpt.cache import load_artifact  # noqa: E402
+from dmpt.get_fnc_data import call_dmp_api_windowed, date_windows, deduplicate_projects  # noqa: E402
+
+
+def test_date_windows() -> None:
+    assert date_windows("2024.01.01", "2024.03.15", window_days=30) == [
+        ("2024.01.01", "2024.01.31"),
+        ("2024.01.31", "2024.03.01"),
+        ("2024.03.01", "2024.03.15"),
+    ]
+    assert date_windows("2024.01.01", "2024.01.01") == []
+    with pytest.raises(ValueError):
+        date_windows("2024.01.01", "2024.03.15", window_days=0)
+
+
+def test_deduplicate_projects_keeps_latest() -> None:
+    projects = [
+        {"ProjectNumber": "1", "DateModified": "2024-01-01T10:00:00", "Status": "old"},
+        {"ProjectNumber": "2", "DateModified": None, "Status": "only"},
+        {"ProjectNumber": "1", "DateModified": "2024-02-01T10:00:00", "Status": "new"},
+        {"ProjectNumber": "1", "DateModified": "2023-12-01T10:00:00", "Status": "older"},
+    ]
+    assert [p["Status"] for p in deduplicate_projects(projects)] == ["new", "only"]
+
+
+class FakeResponse:
+    def __init__(self, projects: list[dict]):
+        self.projects = projects
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        return {"projects": self.projects}
+
+
+def test_call_dmp_api_windowed_retries_windows(monkeypatch) -> None:
+    attempts = {}
+
+    def fake_get(self, url, params, verify, timeout):
+        window = (params["since_date"], params["until_date"])
+        attempts[window] = attempts.get(window, 0) + 1
+        if window == ("2024.01.31", "2024.03.01") and attempts[window] == 1:
+            raise requests.exceptions.Timeout("Read timed out")
+        return FakeResponse([
+            {"ProjectNumber": window[0], "DateModified": window[1]},
+            {"ProjectNumber": "shared", "DateModified": window[1]},
+        ])
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+    monkeypatch.setattr(dmpt.get_fnc_data.time, "sleep", lambda seconds: None)
+
+    projects = call_dmp_api_windowed(since_date="2024.01.01", until_date="2024.03.15", window_days=30, retries=2)
+
+    assert attempts == {
+        ("2024.01.01", "2024.01.31"): 1,
+        ("2024.01.31", "2024.03.01"): 2,
+        ("2024.03.01", "2024.03.15"): 1,
+    }
+    assert projects == [
+        {"ProjectNumber": "2024.01.01", "DateModified": "2024.01.31"},
+        {"ProjectNumber": "shared", "DateModified": "2024.03.15"},
+        {"ProjectNumber": "2024.01.31", "DateModified": "2024.03.01"},
+        {"ProjectNumber": "2024.03.01", "DateModified": "2024.03.15"},
+    ]
+
+
+def test_call_dmp_api_windowed_raises_after_failed_window(monkeypatch) -> None:
+    attempts = {}
+
+    def fake_get(self, url, params, verify, timeout):
+        window = (params["since_date"], params["until_date"])
+        attempts[window] = attempts.get(window, 0) + 1
+        if window == ("2024.01.31", "2024.03.01"):
+            raise requests.exceptions.ConnectionError("Connection refused")
+        return FakeResponse([{"ProjectNumber": window[0], "DateModified": window[1]}])
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+    monkeypatch.setattr(dmpt.get_fnc_data.time, "sleep", lambda seconds: None)
+
+    with pytest.raises(RuntimeError, match="2024.01.31 - 2024.03.01"):
+        call_dmp_api_windowed(since_date="2024.01.01", until_date="2024.03.15", window_days=30, retries=2)
+    # The other windows were still completed
+    assert attempts == {
+        ("2024.01.01", "2024.01.31"): 1,
+        ("2024.01.31", "2024.03.01"): 3,
+        ("2024.03.01", "2024.03.15"): 1,
+    }
+
+
+def test_call_dmp_api_windowed_reports_projects_outside_window(monkeypatch, capsys) -> None:
+    # An API that ignores the upper bound returns everything modified since the start of the window
+    history = [
+        {"ProjectNumber": "1", "DateModified": "2024-01-10T12:00:00"},
+        {"ProjectNumber": "2", "DateModified": "2024-02-10T12:00:00"},
+        {"ProjectNumber": "3", "DateModified": "2024-03-10T12:00:00"},
+    ]
+
+    def fake_get(self, url, params, verify, timeout):
+        since = pd.Timestamp(params["since_date"].replace(".", "-"))
+        return FakeResponse([p for p in history if pd.Timestamp(p["DateModified"]) >= since])
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+
+    projects = call_dmp_api_windowed(since_date="2024.01.01", until_date="2024.03.15", window_days=30)
+
+    assert projects == history
+    assert "3 projects were modified outside the window" in capsys.readouterr().out
+
+
+def test_call_dmp_api_windowed_keeps_projects_modified_after_their_window(monkeypatch) -> None:
+    # An API that filters on the creation date returns a project in the window it was created in
+    def fake_get(self, url, params, verify, timeout):
+        if params["since_date"] == "2024.01.01":
+            return FakeResponse([{"ProjectNumber": "1", "DateCreated": "2024-01-10", "DateModified": "2024-03-10"}])
+        return FakeResponse([])
+
+    monkeypatch.setattr(requests.Session, "get", fake_get)
+
+    projects = call_dmp_api_windowed(since_date="2024.01.01", until_date="2024.03.15", window_days=30)
+
+    assert [project["ProjectNumber"] for project in projects] == ["1"]
+
+
+def test_fetch_without_projects_is_not_cached(tmp_path, monkeypatch) -> None:
+    monkeypatch.delenv("API_WINDOW_DAYS", raising=False)
+    monkeypatch.setattr(dmpt.get_fnc_data, "call_dmp_api", lambda: [])
+    with pytest.raises(ValueError):
+        pipeline.run_pipeline(["fetch"], str(tmp_path))
+    assert load_artifact("fetch", str(tmp_path)) is None
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.inputs import write_dmp_v1_docx
+from dmpt.score_dmp_files import read_and_score_dmps
+from dmpt.tools.io_scheduler import AdaptiveIOScheduler, get_scheduler
+
+
+def test_map_returns_results_in_order() -> None:
+    scheduler = AdaptiveIOScheduler(initial_concurrency=4)
+    assert scheduler.map(lambda x: x * 2, range(50)) == [x * 2 for x in range(50)]
+    assert scheduler.report()["operations"] == 50
+
+
+def test_map_exceptions() -> None:
+    def fail_on_odd(x: int) -> int:
+        if x % 2:
+            raise OSError(f"Cannot read {x}")
+        return x
+
+    scheduler = AdaptiveIOScheduler()
+    with pytest.raises(OSError):
+        scheduler.map(fail_on_odd, range(4))
+
+    results = scheduler.map(fail_on_odd, range(4), return_exceptions=True)
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], OSError) and isinstance(results[3], OSError)
+
+
+def test_concurrency_stays_below_limit() -> None:
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def operation(_) -> None:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.001)
+        with lock:
+            in_flight -= 1
+
+    scheduler = AdaptiveIOScheduler(min_concurrency=1, max_concurrency=3, initial_concurrency=3)
+    scheduler.map(operation, range(100))
+    assert max_in_flight <= 3
+
+
+def test_limit_increases_while_latency_is_stable() -> None:
+    scheduler = AdaptiveIOScheduler(min_concurrency=1, max_concurrency=6, initial_concurrency=2, window_size=5)
+    scheduler.map(lambda _: time.sleep(0.01), range(60))
+    assert scheduler.report()["concurrency_limit_max"] > 2
+
+
+def test_limit_decreases_when_latency_rises() -> None:
+    scheduler = AdaptiveIOScheduler(min_concurrency=2, max_concurrency=16, initial_concurrency=16, window_size=5)
+    scheduler.map(lambda _: time.sleep(0.001), range(5))
+    scheduler.map(lambda _: time.sleep(0.05), range(10))
+    assert scheduler.limit < 16
+    assert scheduler.report()["concurrency_limit_min"] >= 2
+
+
+def test_limit_decreases_on_errors() -> None:
+    def fail(_) -> None:
+        raise OSError("Share unavailable")
+
+    scheduler = AdaptiveIOScheduler(min_concurrency=1, max_concurrency=8, initial_concurrency=8, window_size=4)
+    scheduler.map(fail, range(4), return_exceptions=True)
+    assert scheduler.limit == 4
+    report = scheduler.report()
+    assert report["errors"] == 4
+    assert report["latency_p50_ms"] <= report["latency_p90_ms"] <= report["latency_p99_ms"]
+
+
+def test_invalid_bounds() -> None:
+    with pytest.raises(ValueError):
+        AdaptiveIOScheduler(min_concurrency=4, max_concurrency=2)
+
+
+def test_version_detection_and_reads_use_separate_schedulers(tmp_path) -> None:
+    path = write_dmp_v1_docx(str(tmp_path / "1-BGS_v1.1-data-management-plan.docx"))
+    version_operations = get_scheduler("version").report()["operations"]
+    read_operations = get_scheduler("read").report()["operations"]
+
+    read_and_score_dmps({1: path})
+
+    assert get_scheduler("version").report()["operations"] == version_operations + 1
+    assert get_scheduler("read").report()["operations"] == read_operations + 1
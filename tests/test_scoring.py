@@ -0,0 +1,77 @@
+import pytest
+
+from benchmarks.bench_scoring import compare_to_baseline, measure, run_benchmarks
+from benchmarks.inputs import (
+    DMP_V1_TABLES,
+    PARSE_CHECKBOXES_CASES,
+    PROJECT_INFO_CASES,
+    SCORE_DMP_V2_CASES,
+    SCORE_SINGLE_DMP_V1_CASES,
+    TEXT_IS_NOT_DEFAULT_CASES,
+    write_dmp_v1_docx,
+)
+from dmpt.dmp_v1 import read_and_score_dmp_v1, read_tables, score_single_dmp_v1
+from dmpt.dmp_v2 import score_dmp_v2
+from dmpt.tools.parsers import parse_checkboxes, project_info, text_is_not_default
+
+
+@pytest.mark.parametrize("text, expected", PARSE_CHECKBOXES_CASES.items())
+def test_parse_checkboxes(text: str, expected: dict[str, bool]) -> None:
+    assert parse_checkboxes(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", PROJECT_INFO_CASES.items())
+def test_project_info(text: str, expected: dict[str, str]) -> None:
+    assert project_info(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", TEXT_IS_NOT_DEFAULT_CASES.items())
+def test_text_is_not_default(text: str, expected: bool) -> None:
+    assert text_is_not_default(text) == expected
+
+
+@pytest.mark.parametrize("values, expected", SCORE_DMP_V2_CASES.values(), ids=SCORE_DMP_V2_CASES.keys())
+def test_score_dmp_v2(values: dict[str, str], expected: tuple[float, float, float]) -> None:
+    assert score_dmp_v2(values) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("tables, expected", SCORE_SINGLE_DMP_V1_CASES.values(), ids=SCORE_SINGLE_DMP_V1_CASES.keys())
+def test_score_single_dmp_v1(tables: dict[int, list[list[str]]], expected: tuple[float, float, float]) -> None:
+    assert score_single_dmp_v1(tables) == pytest.approx(expected)
+
+
+def test_read_tables(tmp_path) -> None:
+    path = write_dmp_v1_docx(str(tmp_path / "123456789-BGS_v1.1-data-management-plan.docx"))
+    assert read_tables(path) == DMP_V1_TABLES
+    assert read_tables(path, target_tables=[2, 6]) == {2: DMP_V1_TABLES[2], 6: DMP_V1_TABLES[6]}
+    assert read_and_score_dmp_v1(path) == pytest.approx(SCORE_SINGLE_DMP_V1_CASES["partial"][1])
+
+
+def test_benchmarks_match_golden_results() -> None:
+    results, wrong = run_benchmarks(min_time=0.0)
+    assert wrong == []
+    assert set(results) >= {"parse_checkboxes", "read_tables", "score_dmp_v2[partial]"}
+
+
+def test_compare_to_baseline() -> None:
+    baseline = {"score": {"ops_per_sec": 1000.0, "peak_bytes": 1000, "allocated_blocks": 100}}
+    assert compare_to_baseline(
+        {"score": {"ops_per_sec": 800.0, "peak_bytes": 1200, "allocated_blocks": 120}}, baseline, 0.25
+    ) == []
+    regressions = compare_to_baseline(
+        {"score": {"ops_per_sec": 700.0, "peak_bytes": 1300, "allocated_blocks": 130}}, baseline, 0.25
+    )
+    assert len(regressions) == 3
+    assert compare_to_baseline({"new": {"ops_per_sec": 1.0, "peak_bytes": 1, "allocated_blocks": 1}}, baseline) == []
+    # Baselines stored before the allocated blocks were measured
+    old_baseline = {"score": {"ops_per_sec": 1000.0, "peak_bytes": 1000}}
+    assert compare_to_baseline(
+        {"score": {"ops_per_sec": 1000.0, "peak_bytes": 1000, "allocated_blocks": 1000}}, old_baseline
+    ) == []
+
+
+def test_measure_counts_allocated_blocks() -> None:
+    cache = []
+    result = measure(lambda: cache.extend(object() for _ in range(1000)), min_time=0.0)
+    assert result["allocated_blocks"] >= 1000
+    assert result["peak_bytes"] > 0
@@ -0,0 +1,114 @@
+import datetime
+import json
+import os
+import pickle
+
+import pandas as pd
+import pytest
+
+import dmpt.pipeline
+import dmpt.shard
+from dmpt.cache import artifact_path, save_artifact
+from dmpt.pipeline import run_shard, run_shard_merge
+from dmpt.shard import combine_shards, score_shard, select_shard
+
+
+@pytest.fixture
+def df_api() -> pd.DataFrame:
+    return pd.DataFrame({
+        "ProjectNumber": ["11200000", "11200499", "11200500", "11201000", "11201613", "invalid"],
+    })
+
+
+def test_shards_partition_projects(df_api: pd.DataFrame) -> None:
+    shards = [set(select_shard(df_api, shard_index, 3).ProjectNumber) for shard_index in range(3)]
+    assert shards == [{"11200500"}, {"11201000"}, {"11200000", "11200499", "11201613"}]
+
+
+def test_select_shard_invalid_index(df_api: pd.DataFrame) -> None:
+    with pytest.raises(ValueError):
+        select_shard(df_api, 3, 3)
+
+
+def test_combine_shards_reports_missing(tmp_path, df_api: pd.DataFrame, monkeypatch) -> None:
+    monkeypatch.setattr(
+        dmpt.shard,
+        "create_dmp_dataframe",
+        lambda df, projects_root: pd.DataFrame({"ProjectNumber": df.ProjectNumber.astype(int)}),
+    )
+    score_shard(df_api, "run1", 0, 3, str(tmp_path))
+    score_shard(df_api, "run1", 1, 3, str(tmp_path))
+
+    dmps_table, missing = combine_shards(str(tmp_path), "run1", 3)
+    assert missing == [2]
+    assert sorted(dmps_table.ProjectNumber) == [11200500, 11201000]
+
+
+def test_combine_shards_ignores_other_runs(tmp_path, df_api: pd.DataFrame, monkeypatch) -> None:
+    monkeypatch.setattr(
+        dmpt.shard,
+        "create_dmp_dataframe",
+        lambda df, projects_root: pd.DataFrame({"ProjectNumber": df.ProjectNumber.astype(int)}),
+    )
+    for shard_index in range(3):
+        score_shard(df_api, "run1", shard_index, 3, str(tmp_path))
+    score_shard(df_api, "run2", 1, 3, str(tmp_path))
+
+    dmps_table, missing = combine_shards(str(tmp_path), "run2", 3)
+    assert missing == [0, 2]
+    assert sorted(dmps_table.ProjectNumber) == [11201000]
+
+
+def test_shard_merge_treats_shards_of_previous_fetch_as_missing(tmp_path, df_api: pd.DataFrame, monkeypatch) -> None:
+    monkeypatch.setattr(
+        dmpt.shard,
+        "create_dmp_dataframe",
+        lambda df, projects_root: pd.DataFrame({"ProjectNumber": df.ProjectNumber.astype(int)}),
+    )
+    cache_dir, shard_dir = str(tmp_path / "cache"), str(tmp_path / "shards")
+    save_artifact("fetch", df_api, cache_dir)
+    for shard_index in range(2):
+        run_shard(shard_index, 2, shard_dir, cache_dir)
+
+    # The project data is fetched again, the shards belong to the previous run
+    save_artifact("fetch", df_api, cache_dir)
+    assert run_shard_merge(2, shard_dir, cache_dir) == [0, 1]
+
+
+def test_run_shard_uses_expired_project_data(tmp_path, df_api: pd.DataFrame, monkeypatch) -> None:
+    monkeypatch.setattr(
+        dmpt.shard,
+        "create_dmp_dataframe",
+        lambda df, projects_root: pd.DataFrame({"ProjectNumber": df.ProjectNumber.astype(int)}),
+    )
+
+    def fetch():
+        raise AssertionError("shard nodes must not fetch")
+
+    monkeypatch.setitem(dmpt.pipeline.STAGE_DEFINITIONS, "fetch", (fetch, []))
+    monkeypatch.setitem(dmpt.pipeline.STAGE_DEFINITIONS, "export", (lambda df_total: "output", ["merge"]))
+    cache_dir, shard_dir = str(tmp_path / "cache"), str(tmp_path / "shards")
+
+    with pytest.raises(FileNotFoundError):
+        run_shard(0, 2, shard_dir, cache_dir)
+
+    save_artifact("fetch", df_api[df_api.ProjectNumber != "invalid"], cache_dir)
+    run_shard(0, 2, shard_dir, cache_dir)
+
+    # The project data expires before the second node starts
+    path = artifact_path("fetch", cache_dir)
+    with open(path, "rb") as f:
+        artifact = pickle.load(f)
+    artifact["created"] -= datetime.timedelta(hours=25)
+    with open(path, "wb") as f:
+        pickle.dump(artifact, f)
+    run_shard(1, 2, shard_dir, cache_dir)
+
+    assert run_shard_merge(2, shard_dir, cache_dir, ttl_hours=24) == []
+
+    # Every shard writes its own run report
+    for shard_index in range(2):
+        with open(os.path.join(cache_dir, f"run_report-shard-{shard_index:03d}-of-002.json")) as f:
+            report = json.load(f)
+        assert report["shard_index"] == shard_index
+        assert "io" in report
@@ -0,0 +1,115 @@
+import os
+import sqlite3
+
+import pytest
+
+import dmpt.watch
+from dmpt.score_dmp_files import dmp_folder
+from dmpt.watch import DmpWatcher, watch
+
+
+def create_dmp(projects_root: str, project_number: int, mtime: float) -> str:
+    folder = dmp_folder(project_number, projects_root)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{project_number}-BGS_v2.1-data-management-plan.docx")
+    with open(path, "wb"):
+        pass
+    touch(path, mtime)
+    return path
+
+
+def touch(path: str, mtime: float) -> None:
+    os.utime(path, (mtime, mtime))
+    os.utime(os.path.dirname(path), (mtime, mtime))
+
+
+@pytest.fixture
+def projects_root(tmp_path) -> str:
+    return str(tmp_path / "Projects")
+
+
+def test_poll_reports_new_and_modified_dmps(projects_root: str) -> None:
+    path1 = create_dmp(projects_root, 11200501, 1_000_000)
+    path2 = create_dmp(projects_root, 11201000, 1_000_000)
+    watcher = DmpWatcher(projects_root)
+
+    assert watcher.poll([11200501, 11201000, 11209999]) == {11200501: path1, 11201000: path2}
+    assert watcher.poll([11200501, 11201000, 11209999]) == {}
+
+    touch(path2, 2_000_000)
+    path3 = create_dmp(projects_root, 11209999, 2_000_000)
+    assert watcher.poll([11200501, 11201000, 11209999]) == {11201000: path2, 11209999: path3}
+
+
+def test_poll_skips_known_dmps(projects_root: str) -> None:
+    path = create_dmp(projects_root, 11200501, 1_000_000)
+    watcher = DmpWatcher(projects_root, known_dmps={11200501: (path, 1_000_000)})
+    assert watcher.poll([11200501]) == {}
+
+
+def test_poll_reports_modified_dmp_in_subfolder(projects_root: str) -> None:
+    subfolder = os.path.join(dmp_folder(11200501, projects_root), "DMP")
+    os.makedirs(subfolder)
+    path = os.path.join(subfolder, "11200501-BGS_v2.1-data-management-plan.docx")
+    with open(path, "wb"):
+        pass
+    touch(path, 1_000_000)
+    watcher = DmpWatcher(projects_root)
+
+    assert watcher.poll([11200501]) == {11200501: path}
+    assert watcher.poll([11200501]) == {}
+
+    # Saving the DMP only changes the subfolder, not the DMP folder
+    touch(path, 2_000_000)
+    assert watcher.poll([11200501]) == {11200501: path}
+
+
+def test_watch_retries_dmps_that_could_not_be_scored(projects_root: str, tmp_path, monkeypatch) -> None:
+    create_dmp(projects_root, 11200501, 1_000_000)
+    scores = iter([(-1, -1, -1), (50.0, 100.0, 75.0)])
+    monkeypatch.setattr(
+        dmpt.watch,
+        "read_and_score_dmps",
+        lambda dmp: {project_number: next(scores) for project_number in dmp},
+    )
+    db_path = str(tmp_path / "dmp_data.db")
+
+    watch(lambda: [11200501], db_path=db_path, interval_seconds=0, projects_root=projects_root, max_polls=2)
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT project_number, total_score FROM dmp_scores").fetchall()
+    conn.close()
+    assert rows == [(11200501, 75.0)]
+
+
+def test_watch_upserts_scores(projects_root: str, tmp_path, monkeypatch) -> None:
+    create_dmp(projects_root, 11200501, 1_000_000)
+    monkeypatch.setattr(
+        dmpt.watch,
+        "read_and_score_dmps",
+        lambda dmp: {project_number: (50.0, 100.0, 75.0) for project_number in dmp},
+    )
+    db_path = str(tmp_path / "dmp_data.db")
+
+    watch(lambda: [11200501], db_path=db_path, projects_root=projects_root, max_polls=1)
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT project_number, total_score, dmp_mtime FROM dmp_scores").fetchall()
+    conn.close()
+    assert rows == [(11200501, 75.0, 1_000_000)]
+
+
+def test_watch_keeps_project_numbers_when_update_fails(projects_root: str, tmp_path, monkeypatch) -> None:
+    create_dmp(projects_root, 11200501, 1_000_000)
+    polled = []
+    monkeypatch.setattr(dmpt.watch.DmpWatcher, "poll", lambda self, numbers: polled.append(numbers) or {})
+    results = iter([[11200501]])
+
+    def get_project_numbers():
+        return next(results)
+
+    db_path = str(tmp_path / "dmp_data.db")
+    watch(get_project_numbers, db_path=db_path, interval_seconds=0, projects_root=projects_root, max_polls=2)
+    assert polled == [[11200501], [11200501]]
+
+    with pytest.raises(StopIteration):
+        watch(get_project_numbers, db_path=db_path, projects_root=projects_root, max_polls=1)